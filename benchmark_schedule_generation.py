@@ -0,0 +1,242 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, Any, List, Optional
+
+from synthetic_bim_model import write_synthetic_model
+
+# Scale presets for the synthetic model
+SCALES = {
+    'small': {'objects': 2000, 'codes': 60, 'floors': 4, 'dependency_density': 0.1},
+    'medium': {'objects': 20000, 'codes': 160, 'floors': 8, 'dependency_density': 0.2},
+    'large': {'objects': 100000, 'codes': 400, 'floors': 20, 'dependency_density': 0.3},
+}
+
+BASELINE_FILE = 'benchmark_baselines.json'
+THRESHOLDS_FILE = 'benchmark_thresholds.json'
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    """Temporarily change the working directory (the scripts read and write relative paths)"""
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def bench_create_schedule(model_dir: str) -> Callable[[], Any]:
+    """create_schedule() reading the synthetic classification results"""
+    from create_schedule_from_objects import create_schedule
+    return create_schedule
+
+
+def bench_construction_schedule(model_dir: str) -> Callable[[], Any]:
+    """ConstructionScheduleGenerator with all supported phases enabled"""
+    from create_construction_schedule import ConstructionScheduleGenerator
+    params = load_json(os.path.join(model_dir, 'construction_params.json'))
+
+    def run():
+        generator = ConstructionScheduleGenerator()
+        generator.set_project_start_date(params['projectStartDate'])
+        generator.set_building_type(params['buildingType'])
+        generator.add_phases(params)
+        return generator.generate_schedule()
+    return run
+
+
+def bench_split_json_file(model_dir: str) -> Callable[[], Any]:
+    """split_json_file() on the synthetic bim_objects_with_volumes.json"""
+    from split_json_file import split_json_file
+    input_file = os.path.join(model_dir, 'bim_objects_with_volumes.json')
+    output_dir = os.path.join(model_dir, 'chunks')
+
+    def run():
+        return split_json_file(input_file, output_dir, max_size_mb=1)
+    return run
+
+
+def _gantt_bench(renderer_name: str, **kwargs) -> Callable[[str], Callable[[], Any]]:
+    def setup(model_dir: str) -> Callable[[], Any]:
+        import create_improved_gantt
+        renderer = getattr(create_improved_gantt, renderer_name)
+        schedule_file = os.path.join(model_dir, 'detailed_schedule_with_child_tasks.json')
+
+        def run():
+            # The renderers annotate the task dicts in place, so start from a fresh copy
+            return renderer(load_json(schedule_file), {}, **kwargs)
+        return run
+    setup.__doc__ = f"{renderer_name}() on the synthetic floor-level schedule"
+    return setup
+
+
+BENCHMARKS = {
+    'create_schedule': bench_create_schedule,
+    'construction_schedule': bench_construction_schedule,
+    'split_json_file': bench_split_json_file,
+    'gantt_interactive': _gantt_bench('create_interactive_scrollable_gantt', max_tasks=35),
+    'gantt_matplotlib': _gantt_bench('create_matplotlib_gantt_improved', max_tasks=25),
+    'gantt_timeline': _gantt_bench('create_timeline_focused_charts', force=True),
+}
+
+
+def measure(run: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """
+    Time a benchmark and measure its peak memory.
+
+    Timing runs and the memory run are separate because tracemalloc slows
+    down allocation-heavy code considerably.
+    """
+    timings = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'min_s': round(min(timings), 4),
+        'median_s': round(statistics.median(timings), 4),
+        'peak_mb': round(peak / (1024 * 1024), 2)
+    }
+
+
+def run_benchmarks(scale: Dict[str, Any], names: Optional[List[str]] = None,
+                   repeat: int = 3) -> Dict[str, Dict[str, Any]]:
+    """Generate a synthetic model at the given scale and run the selected benchmarks"""
+    model_dir = tempfile.mkdtemp(prefix='schedule_bench_')
+    results = {}
+    try:
+        print(f"Generating synthetic model: {scale}")
+        write_synthetic_model(model_dir, **scale)
+
+        with working_directory(model_dir):
+            for name in names or list(BENCHMARKS):
+                try:
+                    run = BENCHMARKS[name](model_dir)
+                except ImportError as e:
+                    print(f"   • {name}: skipped ({e})")
+                    results[name] = {'skipped': str(e)}
+                    continue
+                results[name] = measure(run, repeat)
+                print(f"   • {name}: {results[name]['median_s']:.4f}s median, "
+                      f"{results[name]['peak_mb']:.2f} MB peak")
+    finally:
+        shutil.rmtree(model_dir, ignore_errors=True)
+    return results
+
+
+def check_thresholds(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                     thresholds: Dict[str, Any]) -> List[str]:
+    """
+    Compare results against the baseline and the configured thresholds.
+
+    Thresholds are either ratios against the stored baseline (max_time_ratio,
+    max_memory_ratio) or absolute limits (max_seconds, max_peak_mb). Time ratios
+    are not checked for runs faster than min_seconds, where timer noise dominates,
+    nor memory ratios for peaks below min_peak_mb.
+    Per-benchmark settings override the defaults.
+
+    Returns:
+        List of human-readable threshold violations
+    """
+    failures = []
+    for name, result in results.items():
+        if 'skipped' in result:
+            continue
+        limits = dict(thresholds.get('default', {}))
+        limits.update(thresholds.get('benchmarks', {}).get(name, {}))
+        reference = baseline.get(name)
+
+        if 'max_seconds' in limits and result['median_s'] > limits['max_seconds']:
+            failures.append(f"{name}: {result['median_s']:.4f}s exceeds limit of {limits['max_seconds']}s")
+        if 'max_peak_mb' in limits and result['peak_mb'] > limits['max_peak_mb']:
+            failures.append(f"{name}: {result['peak_mb']:.2f} MB exceeds limit of {limits['max_peak_mb']} MB")
+
+        if not reference or 'skipped' in reference:
+            continue
+        if ('max_time_ratio' in limits and reference['median_s'] > 0
+                and result['median_s'] >= limits.get('min_seconds', 0)):
+            ratio = result['median_s'] / reference['median_s']
+            if ratio > limits['max_time_ratio']:
+                failures.append(f"{name}: {result['median_s']:.4f}s is {ratio:.2f}x the baseline "
+                                f"({reference['median_s']:.4f}s, allowed {limits['max_time_ratio']}x)")
+        if ('max_memory_ratio' in limits and reference['peak_mb'] > 0
+                and result['peak_mb'] >= limits.get('min_peak_mb', 0)):
+            ratio = result['peak_mb'] / reference['peak_mb']
+            if ratio > limits['max_memory_ratio']:
+                failures.append(f"{name}: {result['peak_mb']:.2f} MB is {ratio:.2f}x the baseline "
+                                f"({reference['peak_mb']:.2f} MB, allowed {limits['max_memory_ratio']}x)")
+    return failures
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the schedule generation scripts")
+    parser.add_argument('--scale', choices=list(SCALES), default='small')
+    parser.add_argument('--objects', type=int, help="Override the number of objects")
+    parser.add_argument('--codes', type=int, help="Override the number of codes")
+    parser.add_argument('--floors', type=int, help="Override the number of floors")
+    parser.add_argument('--dependency-density', type=float, help="Override the dependency density")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help="Run only these benchmarks")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline-file', default=BASELINE_FILE)
+    parser.add_argument('--thresholds-file', default=THRESHOLDS_FILE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Store the results as the new baseline for this scale")
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in ('objects', 'codes', 'floors', 'dependency_density'):
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    # Baselines are only comparable for runs at the same scale
+    scale_key = args.scale if scale == SCALES[args.scale] else json.dumps(scale, sort_keys=True)
+
+    baselines = load_json(args.baseline_file) if os.path.exists(args.baseline_file) else {}
+    thresholds = load_json(args.thresholds_file) if os.path.exists(args.thresholds_file) else {}
+
+    results = run_benchmarks(scale, names=args.only, repeat=args.repeat)
+
+    if args.update_baseline:
+        baselines.setdefault(scale_key, {}).update(results)
+        with open(args.baseline_file, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2)
+        print(f"\nBaseline for '{scale_key}' saved to: {args.baseline_file}")
+        return
+
+    failures = check_thresholds(results, baselines.get(scale_key, {}), thresholds)
+    if failures:
+        print(f"\n{len(failures)} benchmark threshold(s) exceeded:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+
+    print("\nAll benchmarks within thresholds")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+
+from normalize_objects import ObjectValidator, iter_records
+from project_store import ProjectStore, normalize_object
+
+MAPPED_OBJECTS_FILE = 'mapped_objects_simple.json'
+UNMAPPED_OBJECTS_FILE = 'unmapped_objects_simple.json'
+UNMAPPED_LABELS_FILE = 'unmapped_labels_for_schedule.json'
+COVERAGE_STATS_FILE = 'mapping_coverage_stats.json'
+
+# Sequence assigned to codes missing from the catalog, sorts them last
+UNKNOWN_SEQUENCE = 999
+
+
+def build_mapping_index(schedule_mapping: Dict[str, Dict[str, Any]],
+                        schedule_keys: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """
+    Build a prefix index from object codes to the schedule entries mapping them.
+
+    Every object_mapping entry is a code prefix: it covers objects labelled with
+    the code itself and with any code below it in the hierarchy.
+
+    Args:
+        schedule_mapping: Content of schedule_to_object_mapping.json
+        schedule_keys: Only index these schedule entries (e.g. the entries used
+            in the current schedule). All entries are indexed when None.
+
+    Returns:
+        Mapping of object code prefix to the schedule keys listing it
+    """
+    selected = set(schedule_keys) if schedule_keys is not None else None
+    index = {}
+    for schedule_key, entry in schedule_mapping.items():
+        if selected is not None and schedule_key not in selected:
+            continue
+        for object_code in entry.get('object_mapping', []):
+            index.setdefault(object_code, []).append(schedule_key)
+    return index
+
+
+def code_prefixes(code: str) -> List[str]:
+    """Return the code and its ancestors, most specific first (KO.01.02 -> KO.01.02, KO.01, KO)"""
+    parts = code.split('.')
+    return ['.'.join(parts[:i]) for i in range(len(parts), 0, -1)]
+
+
+class MappingResolver:
+    """Resolves object codes against the prefix index, once per distinct code"""
+
+    def __init__(self, index: Dict[str, List[str]]):
+        self.index = index
+        self._resolved = {}
+
+    def resolve(self, code: str) -> Tuple[Optional[str], Tuple[str, ...]]:
+        """Return the matching prefix and the schedule keys it maps to, or (None, ()) if unmapped"""
+        resolved = self._resolved.get(code)
+        if resolved is None:
+            resolved = (None, ())
+            for prefix in code_prefixes(code):
+                if prefix in self.index:
+                    resolved = (prefix, tuple(self.index[prefix]))
+                    break
+            self._resolved[code] = resolved
+        return resolved
+
+
+def build_coverage(objects: Iterable[Dict[str, Any]], index: Dict[str, List[str]],
+                   label_sequences: Dict[str, Dict[str, Any]],
+                   floor_distribution: Optional[Dict[str, Dict[str, int]]] = None) -> Dict[str, Any]:
+    """
+    Join classified objects with the mapping index in a single pass.
+
+    The floors of the unmapped labels are counted from the objects unless
+    floor_distribution (object counts per floor and label code, e.g. from
+    ProjectStore.floor_distribution) is given.
+
+    Returns:
+        Dictionary with the mapped objects, unmapped objects, unmapped labels
+        and coverage statistics
+    """
+    resolver = MappingResolver(index)
+    mapped_objects = []
+    unmapped_objects = []
+    unmapped_counts = Counter()
+    unmapped_floors = {}
+    mapped_counts = Counter()
+    schedule_key_counts = Counter()
+    skipped = 0
+
+    for record in objects:
+        obj = normalize_object(record)
+        code = obj['label_code']
+        if not code:
+            skipped += 1
+            continue
+
+        simple = {
+            'GlobalId': obj['global_id'],
+            'label_code': code,
+            'label_name': label_sequences.get(code, {}).get('description') or record.get('label_name') or code
+        }
+        prefix, schedule_keys = resolver.resolve(code)
+        if prefix is None:
+            unmapped_objects.append(simple)
+            unmapped_counts[code] += 1
+            if floor_distribution is None:
+                unmapped_floors.setdefault(code, Counter())[obj['floor'] or 'N/A'] += 1
+        else:
+            mapped_objects.append(simple)
+            mapped_counts[code] += 1
+            for schedule_key in schedule_keys:
+                schedule_key_counts[schedule_key] += 1
+
+    unmapped_labels = []
+    for code, count in unmapped_counts.items():
+        if floor_distribution is None:
+            floors = unmapped_floors[code]
+        else:
+            floors = floor_distribution.get(code, {})
+        info = label_sequences.get(code, {})
+        description = info.get('description', code)
+        unmapped_labels.append({
+            'object_code': code,
+            'description': description,
+            'sequence': info.get('sequence', UNKNOWN_SEQUENCE),
+            'total_objects': count,
+            'floors_distribution': dict(floors),
+            'suggested_task_name': f"Construction of {description}",
+            'can_create_schedule_task': True
+        })
+    unmapped_labels.sort(key=lambda label: (label['sequence'], label['object_code']))
+
+    total = len(mapped_objects) + len(unmapped_objects)
+    indexed_schedule_keys = {key for keys in index.values() for key in keys}
+    stats = {
+        'total_objects': total,
+        'mapped_objects': len(mapped_objects),
+        'unmapped_objects': len(unmapped_objects),
+        'skipped_without_label': skipped,
+        'coverage': round(len(mapped_objects) / total, 4) if total else 0.0,
+        'mapped_codes': len(mapped_counts),
+        'unmapped_codes': len(unmapped_counts),
+        'codes_unknown_to_catalog': sorted(code for code in unmapped_counts if code not in label_sequences),
+        'objects_per_schedule_entry': dict(sorted(schedule_key_counts.items())),
+        'schedule_entries_without_objects': sorted(indexed_schedule_keys - set(schedule_key_counts))
+    }
+
+    return {
+        'mapped_objects': mapped_objects,
+        'unmapped_objects': unmapped_objects,
+        'unmapped_labels': unmapped_labels,
+        'stats': stats
+    }
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Generate the mapped/unmapped object and label files from classified objects")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--objects', help="Classification results JSON file")
+    source.add_argument('--store', help="Read the objects from a SQLite project store")
+    parser.add_argument('--mapping', default='public/schedule_to_object_mapping.json')
+    parser.add_argument('--catalog', default='public/label_object_sequenced.json')
+    parser.add_argument('--schedule-keys', help="JSON file with the schedule entries to map against")
+    parser.add_argument('--output-dir', default='public')
+    parser.add_argument('--revision', help="Model revision the outputs belong to")
+    parser.add_argument('--force', action='store_true',
+                        help="Regenerate even if the inputs did not change since the last run")
+    args = parser.parse_args()
+
+    input_paths = [p for p in (args.objects, args.store, args.mapping, args.catalog, args.schedule_keys) if p]
+    for path in input_paths:
+        if not os.path.exists(path):
+            print(f"Error: Input file '{path}' not found")
+            sys.exit(1)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    stats_path = os.path.join(args.output_dir, COVERAGE_STATS_FILE)
+    input_hashes = {path: file_sha256(path) for path in input_paths}
+
+    # Re-running for an unchanged model revision is a no-op
+    if not args.force and os.path.exists(stats_path):
+        previous = load_json(stats_path)
+        if previous.get('input_hashes') == input_hashes and previous.get('revision') == args.revision:
+            print(f"Inputs unchanged since {previous.get('generated_at')}, nothing to do (use --force to regenerate)")
+            return
+
+    started = time.perf_counter()
+    schedule_keys = load_json(args.schedule_keys) if args.schedule_keys else None
+    index = build_mapping_index(load_json(args.mapping), schedule_keys)
+    label_sequences = load_json(args.catalog)
+    print(f"Indexed {len(index)} object code prefixes")
+
+    if args.store:
+        with ProjectStore(args.store) as store:
+            coverage = build_coverage(store.iter_objects(), index, label_sequences, store.floor_distribution())
+    else:
+        # Duplicate objects and codes unknown to the catalog would inflate the label counts
+        validator = ObjectValidator(label_sequences)
+        coverage = build_coverage(validator.filter(iter_records(args.objects)), index, label_sequences)
+        coverage['stats']['validation'] = dict(validator.counts)
+        print(f"Validated objects: {validator.summary()}")
+
+    write_json(os.path.join(args.output_dir, MAPPED_OBJECTS_FILE), coverage['mapped_objects'])
+    write_json(os.path.join(args.output_dir, UNMAPPED_OBJECTS_FILE), coverage['unmapped_objects'])
+    write_json(os.path.join(args.output_dir, UNMAPPED_LABELS_FILE), coverage['unmapped_labels'])
+
+    stats = coverage['stats']
+    stats.update({
+        'revision': args.revision,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'elapsed_s': round(time.perf_counter() - started, 3),
+        'input_hashes': input_hashes
+    })
+    write_json(stats_path, stats)
+
+    print(f"Mapped {stats['mapped_objects']} of {stats['total_objects']} objects "
+          f"({stats['coverage']:.1%} coverage) in {stats['elapsed_s']}s")
+    print(f"Unmapped labels: {stats['unmapped_codes']}")
+    print(f"Outputs written to: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
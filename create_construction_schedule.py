@@ -1,13 +1,146 @@
 import json
-from datetime import datetime, timedelta
+import os
+from datetime import datetime
 import pandas as pd
 import sys
+from schedule_format import Schedule, format_day, output_format
+from schedule_instrumentation import progress, span
+
+PHASE_TEMPLATES_FILE = 'phase_templates.json'
+
+def order_phase_templates(templates):
+    """
+    Order phase templates so that every phase follows its predecessors.
+
+    Phases keep their file order where the graph allows it. Raises ValueError
+    for duplicate or unknown phases, cycles, and site phases that depend on a
+    building phase.
+    """
+    by_key = {}
+    for template in templates:
+        if template['key'] in by_key:
+            raise ValueError(f"Duplicate phase '{template['key']}' in phase templates")
+        by_key[template['key']] = template
+    
+    for template in templates:
+        for predecessor in template.get('predecessors', []):
+            if predecessor not in by_key:
+                raise ValueError(f"Phase '{template['key']}' depends on unknown phase '{predecessor}'")
+            if template.get('scope', 'site') == 'site' and by_key[predecessor].get('scope', 'site') == 'building':
+                raise ValueError(f"Site phase '{template['key']}' cannot depend on building phase '{predecessor}'")
+    
+    ordered, placed, visiting = [], set(), set()
+    
+    def visit(key):
+        if key in placed:
+            return
+        if key in visiting:
+            raise ValueError(f"Phase templates contain a cycle through '{key}'")
+        visiting.add(key)
+        for predecessor in by_key[key].get('predecessors', []):
+            visit(predecessor)
+        visiting.discard(key)
+        placed.add(key)
+        ordered.append(by_key[key])
+    
+    for template in templates:
+        visit(template['key'])
+    return ordered
+
+def load_phase_templates(path=None):
+    """Load the phase templates, by default from the working directory or next to this module"""
+    if path is None:
+        path = PHASE_TEMPLATES_FILE
+        if not os.path.exists(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), PHASE_TEMPLATES_FILE)
+    with open(path, 'r', encoding='utf-8') as f:
+        return order_phase_templates(json.load(f)['phases'])
+
+def _get(values, path):
+    """Look up a dotted path (e.g. 'siteSheds.duration') in nested dictionaries"""
+    for part in path.split('.'):
+        if not isinstance(values, dict):
+            return None
+        values = values.get(part)
+    return values
+
+def _merge(defaults, values):
+    """Merge parameters over defaults, nested dictionaries included"""
+    merged = dict(defaults)
+    for key, value in values.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            value = _merge(merged[key], value)
+        merged[key] = value
+    return merged
+
+def _resolve(spec, section, params):
+    """
+    Evaluate a template value: a constant ('value'), a parameter of the phase
+    ('param'), a parameter of the project ('project_param') or a table keyed
+    by a phase parameter ('lookup' with 'values'). Falls back to 'default'.
+    """
+    if 'value' in spec:
+        value = spec['value']
+    elif 'lookup' in spec:
+        value = spec['values'].get(_get(section, spec['lookup']))
+    elif 'project_param' in spec:
+        value = _get(params, spec['project_param'])
+    else:
+        value = _get(section, spec['param'])
+    return spec.get('default') if value is None else value
+
+def _condition_met(condition, section, params):
+    """A condition holds if its value is not excluded by 'not_in', or else is set and positive"""
+    value = _resolve(condition, section, params)
+    if 'not_in' in condition:
+        return value not in condition['not_in']
+    return bool(value) and not (isinstance(value, (int, float)) and value <= 0)
+
+def _task_duration(spec, section, params):
+    """
+    Return the duration of a task in days and the daily rate it was derived from.
+
+    Quantity-based durations divide the quantity by the rate (times its
+    factor), rounded to at least one day; 'multiply_by' scales the result,
+    e.g. by the number of floors.
+    """
+    rate = None
+    if 'quantity' in spec:
+        quantity = _resolve(spec['quantity'], section, params) or 0
+        rate = _resolve(spec['rate'], section, params)
+        if not rate or rate <= 0:
+            rate = spec['rate'].get('default', 1)
+        if 'rate_factor' in spec:
+            rate = rate * _resolve(spec['rate_factor'], section, params)
+        duration = max(1, round(quantity / rate))
+    else:
+        duration = _resolve(spec, section, params) or 0
+    if 'multiply_by' in spec:
+        duration *= max(1, int(_resolve(spec['multiply_by'], section, params) or 1))
+    return int(duration), rate
 
 class ConstructionScheduleGenerator:
-    def __init__(self):
+    """
+    Builds the construction phases from the phase templates (phase_templates.json).
+    
+    Every template describes a phase's tasks with their durations, conditions
+    and overlaps, and the phases it follows. Phases are evaluated once each in
+    dependency order and their end days are kept, so a phase's start is found
+    without looking at the tasks already scheduled. Building phases are
+    repeated for every building of the project.
+    
+    templates are the ordered templates returned by load_phase_templates(),
+    loaded from phase_templates.json when not given.
+    """
+    def __init__(self, templates=None):
         self.schedule_tasks = []
         self.project_start_date = None
         self.building_type = None
+        self.templates = templates if templates is not None else load_phase_templates()
+        self._templates = {template['key']: template for template in self.templates}
+        # Last day (date ordinal) reached by each phase per building, and whether it
+        # lies within the building; skipped phases pass on their predecessors' end
+        self._phase_ends = {}
         
     def set_project_start_date(self, start_date_str):
         """Set the project start date in YYYY-MM-DD format"""
@@ -27,149 +160,171 @@ class ConstructionScheduleGenerator:
         print(f"Error: Building type must be one of {valid_types}")
         return False
 
-    def add_site_establishment(self, mobilise_duration=5, perimeter_type=None, 
-                             site_sheds_duration=None, site_sheds_overlap=0):
-        """Add site establishment phase"""
+    def _scope(self, template, building):
+        return building['id'] if building and template.get('scope', 'site') == 'building' else None
+
+    def _phase_end(self, key, building):
+        """Return the end day of a phase, or of its predecessors if it was skipped, and whether it is a building's"""
+        template = self._templates[key]
+        scope = self._scope(template, building)
+        resolved = self._phase_ends.get((scope, key))
+        if resolved is None:
+            resolved = self._predecessors_end(template, building)
+            self._phase_ends[(scope, key)] = resolved
+        return resolved
+
+    def _predecessors_end(self, template, building):
+        end, internal = None, False
+        for predecessor in template.get('predecessors', []):
+            predecessor_end, predecessor_internal = self._phase_end(predecessor, building)
+            if predecessor_end is not None and (end is None or predecessor_end > end):
+                end = predecessor_end
+            internal = internal or predecessor_internal
+        return end, internal
+
+    def add_phase(self, key, section, params=None, building=None):
+        """
+        Add the tasks of one phase from its template.
+        
+        The phase starts the day after its latest predecessor ends, less its
+        overlap. The tasks of a phase follow each other unless a task does not
+        advance the phase (it runs alongside the next one).
+        
+        Args:
+            key: Template key, e.g. 'excavation'
+            section: Parameters of the phase, merged over the template defaults
+            params: Parameters of the whole project (for 'project_param' values)
+            building: Building with 'id', 'name' and 'offset' (days), for building phases
+        
+        Returns:
+            Last day of the phase as date ordinal, or None if it added no tasks
+        """
         if not self.project_start_date:
             print("Error: Please set project start date first")
-            return
+            return None
         
-        current_date = self.project_start_date
+        template = self._templates[key]
+        scope = self._scope(template, building)
+        section = _merge(template.get('defaults', {}), section or {})
+        params = params or {}
+        
+        if not all(_condition_met(condition, section, params) for condition in template.get('when', [])):
+            return None
+        
+        predecessor_end, internal = self._predecessors_end(template, building)
+        if predecessor_end is None:
+            current_day = self.project_start_date.toordinal()
+        else:
+            overlap = _resolve(template['overlap'], section, params) if 'overlap' in template else 0
+            current_day = predecessor_end + 1 - max(0, overlap or 0)
+        if scope is not None and not internal:
+            # First phase of the building
+            current_day += building['offset']
+        
+        id_prefix = f"{building['id']}." if scope is not None else ''
+        end_day = None
+        for task in template['tasks']:
+            if not all(_condition_met(condition, section, params) for condition in task.get('when', [])):
+                continue
+            duration, rate = _task_duration(task['duration'], section, params)
+            if duration <= 0:
+                continue
+            
+            overlap = _resolve(task['overlap'], section, params) if 'overlap' in task else 0
+            start_day = current_day - overlap if overlap and overlap > 0 else current_day
+            last_day = start_day + duration - 1
+            
+            entry = {
+                'task_id': id_prefix + task['id'],
+                'object_description': task['description'].format_map(section),
+                'start_date': format_day(start_day),
+                'end_date': format_day(last_day),
+                'duration': duration,
+                'phase': template['name']
+            }
+            if scope is not None:
+                entry['building'] = building['name']
+            entry['sequence'] = len(self.schedule_tasks) + 1
+            entry['is_child'] = True
+            if task.get('info'):
+                entry['additional_info'] = {
+                    name: rate if field == '@rate' else _get(section, field)
+                    for name, field in task['info'].items()
+                }
+            self.schedule_tasks.append(entry)
+            
+            if task.get('advance', True):
+                current_day = last_day + 1
+            if end_day is None or last_day > end_day:
+                end_day = last_day
         
-        # Mobilisation task
-        if mobilise_duration > 0:
-            self.schedule_tasks.append({
-                'task_id': 'SE.01',
-                'object_description': 'Site Mobilisation',
-                'start_date': current_date.strftime('%a %d.%m.%y'),
-                'end_date': (current_date + timedelta(days=mobilise_duration-1)).strftime('%a %d.%m.%y'),
-                'duration': mobilise_duration,
-                'phase': 'Site Establishment',
-                'sequence': 1,
-                'is_child': True
-            })
-            current_date += timedelta(days=mobilise_duration)
+        if end_day is not None:
+            self._phase_ends[(scope, key)] = (end_day, scope is not None)
+        return end_day
+
+    def add_phases(self, params):
+        """
+        Add every enabled phase of the planner parameters in one pass over the phase graph.
         
-        # Perimeter setup if specified
-        if perimeter_type and perimeter_type != 'None':
-            perimeter_duration = 3  # Default duration
-            self.schedule_tasks.append({
-                'task_id': 'SE.02',
-                'object_description': f'Perimeter Setup - {perimeter_type}',
-                'start_date': current_date.strftime('%a %d.%m.%y'),
-                'end_date': (current_date + timedelta(days=perimeter_duration-1)).strftime('%a %d.%m.%y'),
-                'duration': perimeter_duration,
-                'phase': 'Site Establishment',
-                'sequence': 2,
-                'is_child': True
-            })
-            current_date += timedelta(days=perimeter_duration)
+        Site phases are added once. Building phases are added for each entry of
+        params['buildings'], whose phase settings are merged over the project's
+        (an entry may also set 'id', 'name' and a 'startOffset' in days), or once
+        for the whole project when there are no buildings.
+        """
+        for template in self.templates:
+            section = params.get(template['key'])
+            if template.get('scope', 'site') == 'site' and section and section.get('enabled', False):
+                with span(template['name'].lower()):
+                    self.add_phase(template['key'], section, params)
         
-        # Site sheds setup if duration specified
-        if site_sheds_duration and site_sheds_duration > 0:
-            start_date = current_date - timedelta(days=site_sheds_overlap) if site_sheds_overlap > 0 else current_date
-            self.schedule_tasks.append({
-                'task_id': 'SE.03',
-                'object_description': 'Site Sheds Setup',
-                'start_date': start_date.strftime('%a %d.%m.%y'),
-                'end_date': (start_date + timedelta(days=site_sheds_duration-1)).strftime('%a %d.%m.%y'),
-                'duration': site_sheds_duration,
-                'phase': 'Site Establishment',
-                'sequence': 3,
-                'is_child': True
-            })
+        building_templates = [template for template in self.templates if template.get('scope') == 'building']
+        buildings = params.get('buildings') or [None]
+        seen = set()
+        with span('building phases'):
+            for index, entry in enumerate(buildings):
+                building, building_params = None, params
+                if entry is not None:
+                    building_id = str(entry.get('id') or f"B{index + 1}")
+                    if building_id in seen:
+                        raise ValueError(f"Duplicate building id '{building_id}'")
+                    seen.add(building_id)
+                    building = {
+                        'id': building_id,
+                        'name': entry.get('name') or building_id,
+                        'offset': int(entry.get('startOffset') or 0)
+                    }
+                    building_params = dict(params)
+                    for key, value in entry.items():
+                        if key in self._templates and isinstance(value, dict):
+                            building_params[key] = _merge(params.get(key) or {}, value)
+                
+                for template in building_templates:
+                    section = building_params.get(template['key'])
+                    if section and section.get('enabled', False):
+                        self.add_phase(template['key'], section, building_params, building)
+
+    def add_site_establishment(self, mobilise_duration=5, perimeter_type=None, 
+                             site_sheds_duration=None, site_sheds_overlap=0):
+        """Add site establishment phase"""
+        self.add_phase('siteEstablishment', {
+            'mobiliseDuration': mobilise_duration,
+            'perimeterType': perimeter_type,
+            'siteSheds': {'enabled': bool(site_sheds_duration), 'duration': site_sheds_duration or 0,
+                          'overlap': site_sheds_overlap}
+        })
 
     def add_demolition_phase(self, main_demolition_duration=None, scaffolding_required=False,
                            scaffolding_erection_duration=None, scaffolding_dismantle_duration=None):
         """Add demolition phase if required"""
-        if not self.project_start_date or not main_demolition_duration:
-            return
-            
-        if not self.schedule_tasks:
-            current_date = self.project_start_date
-        else:
-            current_date = max(task['end_date'] for task in self.schedule_tasks)
-            current_date = datetime.strptime(current_date, '%a %d.%m.%y') + timedelta(days=1)
-        
-        if scaffolding_required and scaffolding_erection_duration:
-            self.schedule_tasks.append({
-                'task_id': 'DM.01',
-                'object_description': 'Scaffolding Erection for Demolition',
-                'start_date': current_date.strftime('%a %d.%m.%y'),
-                'end_date': (current_date + timedelta(days=scaffolding_erection_duration-1)).strftime('%a %d.%m.%y'),
-                'duration': scaffolding_erection_duration,
-                'phase': 'Demolition',
-                'sequence': len(self.schedule_tasks) + 1,
-                'is_child': True
-            })
-            current_date += timedelta(days=scaffolding_erection_duration)
-        
-        # Main demolition
-        self.schedule_tasks.append({
-            'task_id': 'DM.02',
-            'object_description': 'Main Demolition Works',
-            'start_date': current_date.strftime('%a %d.%m.%y'),
-            'end_date': (current_date + timedelta(days=main_demolition_duration-1)).strftime('%a %d.%m.%y'),
-            'duration': main_demolition_duration,
-            'phase': 'Demolition',
-            'sequence': len(self.schedule_tasks) + 1,
-            'is_child': True
+        self.add_phase('demolition', {
+            'duration': main_demolition_duration or 0,
+            'scaffolding': {'enabled': scaffolding_required, 'erectionDuration': scaffolding_erection_duration or 0,
+                            'dismantleDuration': scaffolding_dismantle_duration or 0}
         })
-        current_date += timedelta(days=main_demolition_duration)
-        
-        if scaffolding_required and scaffolding_dismantle_duration:
-            self.schedule_tasks.append({
-                'task_id': 'DM.03',
-                'object_description': 'Scaffolding Dismantling',
-                'start_date': current_date.strftime('%a %d.%m.%y'),
-                'end_date': (current_date + timedelta(days=scaffolding_dismantle_duration-1)).strftime('%a %d.%m.%y'),
-                'duration': scaffolding_dismantle_duration,
-                'phase': 'Demolition',
-                'sequence': len(self.schedule_tasks) + 1,
-                'is_child': True
-            })
 
     def add_excavation_phase(self, soil_type, volume, daily_rate=None):
         """Add excavation phase"""
-        if not volume or volume <= 0:
-            return
-            
-        # Calculate duration based on volume and daily rate
-        if not daily_rate or daily_rate <= 0:
-            daily_rate = 100  # Default m³/day
-        
-        # Adjust daily rate based on soil type
-        soil_type_factors = {
-            "Soft/Loose Soils": 1.0,
-            "Medium Soils": 0.8,
-            "Hard/Dense Soils": 0.6,
-            "Rock": 0.3
-        }
-        adjusted_rate = daily_rate * soil_type_factors.get(soil_type, 1.0)
-        duration = max(1, round(volume / adjusted_rate))
-        
-        # Get last task end date
-        if self.schedule_tasks:
-            current_date = max(task['end_date'] for task in self.schedule_tasks)
-            current_date = datetime.strptime(current_date, '%a %d.%m.%y') + timedelta(days=1)
-        else:
-            current_date = self.project_start_date
-        
-        self.schedule_tasks.append({
-            'task_id': 'EX.01',
-            'object_description': f'Excavation - {soil_type}',
-            'start_date': current_date.strftime('%a %d.%m.%y'),
-            'end_date': (current_date + timedelta(days=duration-1)).strftime('%a %d.%m.%y'),
-            'duration': duration,
-            'phase': 'Excavation',
-            'sequence': len(self.schedule_tasks) + 1,
-            'is_child': True,
-            'additional_info': {
-                'volume': volume,
-                'soil_type': soil_type,
-                'daily_rate': adjusted_rate
-            }
-        })
+        self.add_phase('excavation', {'soilType': soil_type, 'volume': volume, 'dailyRate': daily_rate})
 
     def generate_schedule(self):
         """Generate the construction schedule and return as JSON"""
@@ -181,6 +336,36 @@ class ConstructionScheduleGenerator:
         
         return self.schedule_tasks
 
+def generate_from_params(params, templates=None):
+    """
+    Build the construction schedule for the parameters sent by the planner UI.
+    
+    Callers scheduling many projects pass the templates of load_phase_templates()
+    so they are read once.
+    
+    Returns:
+        List of schedule tasks, or None if the project start date is invalid
+    """
+    # Create generator instance
+    generator = ConstructionScheduleGenerator(templates)
+    
+    # Set project details
+    if 'projectStartDate' in params and params['projectStartDate']:
+        if not generator.set_project_start_date(params['projectStartDate']):
+            return None
+    else:
+        # Default start date if not provided
+        generator.set_project_start_date("2024-01-01")
+    
+    if 'buildingType' in params:
+        generator.set_building_type(params['buildingType'])
+    
+    # Add all enabled phases
+    generator.add_phases(params)
+    
+    # Generate schedule
+    return generator.generate_schedule()
+
 def main():
     # Check if parameters were passed
     if len(sys.argv) < 2:
@@ -189,56 +374,21 @@ def main():
     
     try:
         # Parse JSON parameters from command line
-        params = json.loads(sys.argv[1])
-        
-        # Create generator instance
-        generator = ConstructionScheduleGenerator()
-        
-        # Set project details
-        if 'projectStartDate' in params and params['projectStartDate']:
-            if not generator.set_project_start_date(params['projectStartDate']):
-                sys.exit(1)
-        else:
-            # Default start date if not provided
-            generator.set_project_start_date("2024-01-01")
-        
-        if 'buildingType' in params:
-            generator.set_building_type(params['buildingType'])
-        
-        # Add site establishment phase
-        if 'siteEstablishment' in params and params['siteEstablishment'].get('enabled', False):
-            site_est = params['siteEstablishment']
-            generator.add_site_establishment(
-                mobilise_duration=site_est.get('mobiliseDuration', 5),
-                perimeter_type=site_est.get('perimeterType', 'None'),
-                site_sheds_duration=site_est.get('siteSheds', {}).get('duration', 0) if site_est.get('siteSheds', {}).get('enabled', False) else None,
-                site_sheds_overlap=site_est.get('siteSheds', {}).get('overlap', 0)
-            )
-        
-        # Add demolition phase
-        if 'demolition' in params and params['demolition'].get('enabled', False):
-            demo = params['demolition']
-            generator.add_demolition_phase(
-                main_demolition_duration=demo.get('duration', 10),
-                scaffolding_required=demo.get('scaffolding', {}).get('enabled', False),
-                scaffolding_erection_duration=demo.get('scaffolding', {}).get('erectionDuration', 3),
-                scaffolding_dismantle_duration=demo.get('scaffolding', {}).get('dismantleDuration', 2)
-            )
-        
-        # Add excavation phase
-        if 'excavation' in params and params['excavation'].get('enabled', False):
-            excav = params['excavation']
-            generator.add_excavation_phase(
-                soil_type=excav.get('soilType', 'Soft/Loose Soils'),
-                volume=excav.get('volume', 0),
-                daily_rate=excav.get('dailyRate', 100)
-            )
+        with span('parse params'):
+            params = json.loads(sys.argv[1])
         
-        # Generate schedule
-        schedule = generator.generate_schedule()
+        schedule = generate_from_params(params)
+        if schedule is None:
+            sys.exit(1)
+        progress('tasks built', tasks=len(schedule))
         
-        # Output JSON to stdout
-        print(json.dumps(schedule, indent=2))
+        # Output to stdout, as JSON unless the caller requested the binary format
+        with span('serialize schedule'):
+            if output_format() == 'binary':
+                sys.stdout.buffer.write(Schedule.from_tasks(schedule).to_bytes())
+                sys.stdout.flush()
+            else:
+                print(json.dumps(schedule, indent=2))
         
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON parameters: {e}")
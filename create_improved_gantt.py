@@ -8,6 +8,14 @@ import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import sys
+from gantt_tiles import export_gantt_tiles
+from schedule_instrumentation import progress, span
+
+# Timeline chart tiles: 90-day periods x 20 task rows
+TILES_DIR = 'gantt_tiles'
+TILE_PERIOD_DAYS = 90
+TILE_ROWS_PER_PAGE = 20
+TILE_DPI = 300
 
 def load_schedule_data():
     """Load the detailed schedule data"""
@@ -341,8 +349,80 @@ def create_matplotlib_gantt_improved(schedule_data, label_mapping, max_tasks=30)
     plt.close()
     return fig
 
-def create_timeline_focused_charts(schedule_data, label_mapping):
-    """Create multiple charts focused on different time periods"""
+def render_period_tile(tile, path, label_mapping):
+    """Draw one tile of the timeline charts: a page of task rows within a period"""
+    period_tasks = tile['tasks']
+    current_date, period_end = tile['window']
+
+    fig, ax = plt.subplots(figsize=(18, max(12, len(period_tasks) * 0.8)))
+    
+    # Color mapping
+    object_types = sorted(set([task.get('object_code', '').split('.')[0] for task in period_tasks]))
+    colors = plt.cm.Set2(np.linspace(0, 1, len(object_types)))
+    color_map = dict(zip(object_types, colors))
+    
+    y_positions = range(len(period_tasks))
+    bar_height = 0.7
+    
+    for i, task in enumerate(period_tasks):
+        start_date = max(task['parsed_start'], current_date)
+        end_date = min(task['parsed_end'], period_end)
+        duration = (end_date - start_date).days + 1
+        
+        obj_type = task.get('object_code', '').split('.')[0]
+        color = color_map.get(obj_type, 'gray')
+        
+        # Create bar
+        ax.barh(i, duration, left=start_date, height=bar_height, 
+                color=color, alpha=0.8, edgecolor='black', linewidth=0.5)
+        
+        # Add text
+        task_id = task.get('task_id', '')
+        object_code = task.get('object_code', '')
+        object_count = task.get('object_count', 1)
+        
+        # Use label name instead of description
+        label_name = label_mapping.get(object_code, object_code)
+        bar_text = f"{task_id}: {label_name[:15]} ({object_count})"
+        text_x = start_date + timedelta(days=duration/2)
+        
+        ax.text(text_x, i, bar_text, ha='center', va='center', 
+                fontsize=9, fontweight='bold',
+                bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.9))
+    
+    # Customize plot
+    ax.set_ylim(-0.5, len(period_tasks) - 0.5)
+    ax.set_yticks(y_positions)
+    
+    y_labels = [f"{task.get('task_id', '')} | {task.get('floor', 'N/A')} | {label_mapping.get(task.get('object_code', ''), task.get('object_code', ''))[:25]}" 
+               for task in period_tasks]
+    ax.set_yticklabels(y_labels, fontsize=8)
+    ax.invert_yaxis()
+    
+    # Format dates for this period
+    ax.set_xlim(current_date, period_end + timedelta(days=1))
+    ax.xaxis.set_major_locator(mdates.WeekdayLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+    
+    ax.grid(True, alpha=0.3, axis='x')
+    ax.set_xlabel('Timeline (Days)', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Tasks', fontsize=12, fontweight='bold')
+    ax.set_title(f'Construction Schedule - Period {tile["period"]}, Page {tile["page"]} '
+                 f'({current_date.strftime("%d.%m.%Y")} - {period_end.strftime("%d.%m.%Y")})', 
+                fontsize=14, fontweight='bold')
+    
+    plt.tight_layout()
+    plt.savefig(path, dpi=TILE_DPI, bbox_inches='tight')
+    plt.close(fig)
+
+def create_timeline_focused_charts(schedule_data, label_mapping, output_dir=TILES_DIR, force=False):
+    """
+    Create the timeline charts as tiles of 90-day periods x 20 task rows.
+
+    Every task is on the tiles of every period it overlaps. Only tiles whose
+    tasks changed since the last export are rendered again (see gantt_tiles.py).
+    """
     print("\nCreating timeline-focused charts...")
     
     # Filter for child tasks with valid dates
@@ -355,137 +435,73 @@ def create_timeline_focused_charts(schedule_data, label_mapping):
         
         if start_date and end_date:
             task['parsed_start'] = start_date
-            task['parsed_end'] = end_date
-            task['duration_calc'] = (end_date - start_date).days + 1
+            task['parsed_end'] = max(end_date, start_date)
+            task['duration_calc'] = (task['parsed_end'] - start_date).days + 1
             valid_tasks.append(task)
     
-    if not valid_tasks:
-        return
-    
-    # Sort by start date
-    valid_tasks.sort(key=lambda x: x['parsed_start'])
-    
-    # Find date range
-    min_date = min(task['parsed_start'] for task in valid_tasks)
-    max_date = max(task['parsed_end'] for task in valid_tasks)
-    
-    # Create 3-month periods
-    current_date = min_date
-    period_num = 1
-    
-    while current_date < max_date:
-        period_end = current_date + timedelta(days=90)  # 3 months
-        
-        # Filter tasks for this period
-        period_tasks = [
-            task for task in valid_tasks 
-            if (task['parsed_start'] <= period_end and task['parsed_end'] >= current_date)
-        ]
-        
-        if len(period_tasks) < 3:
-            current_date = period_end
-            continue
-        
-        # Take up to 20 tasks for this period
-        period_tasks = period_tasks[:20]
-        
-        # Create chart for this period
-        fig, ax = plt.subplots(figsize=(18, max(12, len(period_tasks) * 0.8)))
-        
-        # Color mapping
-        object_types = list(set([task.get('object_code', '').split('.')[0] for task in period_tasks]))
-        colors = plt.cm.Set2(np.linspace(0, 1, len(object_types)))
-        color_map = dict(zip(object_types, colors))
-        
-        y_positions = range(len(period_tasks))
-        bar_height = 0.7
-        
-        for i, task in enumerate(period_tasks):
-            start_date = max(task['parsed_start'], current_date)
-            end_date = min(task['parsed_end'], period_end)
-            duration = (end_date - start_date).days + 1
-            
-            obj_type = task.get('object_code', '').split('.')[0]
-            color = color_map.get(obj_type, 'gray')
-            
-            # Create bar
-            ax.barh(i, duration, left=start_date, height=bar_height, 
-                    color=color, alpha=0.8, edgecolor='black', linewidth=0.5)
-            
-            # Add text
-            task_id = task.get('task_id', '')
-            object_code = task.get('object_code', '')
-            object_count = task.get('object_count', 1)
-            
-            # Use label name instead of description
-            label_name = label_mapping.get(object_code, object_code)
-            bar_text = f"{task_id}: {label_name[:15]} ({object_count})"
-            text_x = start_date + timedelta(days=duration/2)
-            
-            ax.text(text_x, i, bar_text, ha='center', va='center', 
-                    fontsize=9, fontweight='bold',
-                    bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.9))
-        
-        # Customize plot
-        ax.set_ylim(-0.5, len(period_tasks) - 0.5)
-        ax.set_yticks(y_positions)
-        
-        y_labels = [f"{task.get('task_id', '')} | {task.get('floor', 'N/A')} | {label_mapping.get(task.get('object_code', ''), task.get('object_code', ''))[:25]}" 
-                   for task in period_tasks]
-        ax.set_yticklabels(y_labels, fontsize=8)
-        ax.invert_yaxis()
-        
-        # Format dates for this period
-        ax.set_xlim(current_date, period_end)
-        ax.xaxis.set_major_locator(mdates.WeekdayLocator())
-        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d.%m'))
-        plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
-        
-        ax.grid(True, alpha=0.3, axis='x')
-        ax.set_xlabel('Timeline (Days)', fontsize=12, fontweight='bold')
-        ax.set_ylabel('Tasks', fontsize=12, fontweight='bold')
-        ax.set_title(f'Construction Schedule - Period {period_num} ({current_date.strftime("%d.%m.%Y")} - {period_end.strftime("%d.%m.%Y")})', 
-                    fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        
-        # Save
-        filename = f'gantt_period_{period_num}.png'
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        print(f"   • {filename}")
-        
-        plt.close()
-        
-        current_date = period_end
-        period_num += 1
-        
-        if period_num > 6:  # Limit to 6 periods
-            break
+    def describe_row(task):
+        # Everything render_period_tile() draws for a task
+        object_code = task.get('object_code', '')
+        return {
+            'task_id': task.get('task_id', ''),
+            'floor': task.get('floor', 'N/A'),
+            'object_code': object_code,
+            'label': label_mapping.get(object_code, object_code),
+            'object_count': task.get('object_count', 1),
+            'start': task['parsed_start'].toordinal(),
+            'end': task['parsed_end'].toordinal()
+        }
+
+    result = export_gantt_tiles(
+        valid_tasks,
+        lambda tile, path: render_period_tile(tile, path, label_mapping),
+        describe_row,
+        output_dir=output_dir,
+        period_days=TILE_PERIOD_DAYS,
+        rows_per_page=TILE_ROWS_PER_PAGE,
+        force=force,
+        render_settings={'dpi': TILE_DPI}
+    )
+
+    print(f"   • {len(result['tiles'])} tiles for {len(valid_tasks)} tasks in {output_dir}/ "
+          f"({result['rendered']} rendered, {result['reused']} unchanged, {result['removed']} removed)")
+    return result
 
 def main():
-    # Check if parameters were passed
-    if len(sys.argv) < 2:
+    # The schedule comes as an argument or, for schedules too large for the command line, on stdin
+    if len(sys.argv) < 2 and sys.stdin.isatty():
         print("Error: No parameters provided")
         sys.exit(1)
     
     try:
-        # Parse JSON parameters from command line
-        schedule_data = json.loads(sys.argv[1])
-        print(f"Loaded {len(schedule_data)} tasks from command line input")
+        # Parse the JSON schedule
+        with span('parse schedule'):
+            if len(sys.argv) >= 2:
+                schedule_data = json.loads(sys.argv[1])
+            else:
+                schedule_data = json.load(sys.stdin)
+        print(f"Loaded {len(schedule_data)} tasks from {'command line' if len(sys.argv) >= 2 else 'stdin'} input")
         
         # Load label mapping
         print("Loading label mapping...")
-        label_mapping = load_label_mapping()
+        with span('load label mapping'):
+            label_mapping = load_label_mapping()
         print(f"Loaded {len(label_mapping)} label mappings")
         
         # Create interactive scrollable Gantt chart
-        create_interactive_scrollable_gantt(schedule_data, label_mapping, max_tasks=35)
+        with span('render interactive chart'):
+            create_interactive_scrollable_gantt(schedule_data, label_mapping, max_tasks=35)
+        progress('chart rendered', chart='interactive')
         
         # Create improved matplotlib chart
-        create_matplotlib_gantt_improved(schedule_data, label_mapping, max_tasks=25)
+        with span('render matplotlib chart'):
+            create_matplotlib_gantt_improved(schedule_data, label_mapping, max_tasks=25)
+        progress('chart rendered', chart='matplotlib')
         
         # Create timeline-focused charts
-        create_timeline_focused_charts(schedule_data, label_mapping)
+        with span('render timeline charts'):
+            create_timeline_focused_charts(schedule_data, label_mapping)
+        progress('chart rendered', chart='timeline')
         
         print(f"\n{'='*60}")
         print("IMPROVED GANTT CHARTS CREATED")
@@ -494,7 +510,7 @@ def main():
         print("   • interactive_scrollable_gantt.html - Interactive chart with timeline scrolling")
         print("   • improved_gantt_chart.png - High-resolution static chart")
         print("   • improved_gantt_chart.pdf - Vector format")
-        print("   • gantt_period_*.png - Timeline-focused period charts")
+        print("   • gantt_tiles/gantt_period_*_page_*.png - Timeline charts covering every task")
         print("\nKey improvements:")
         print("   • Smaller font sizes for better fit")
         print("   • Object descriptions instead of codes")
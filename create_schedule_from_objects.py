@@ -2,6 +2,19 @@ import json
 from datetime import datetime, timedelta
 import pandas as pd
 import os
+from collections import Counter
+from duration_estimator import DurationEstimator, ProductivityTable, aggregate_objects_by_code, load_productivity_table
+from normalize_objects import iter_clean_objects
+from project_store import ProjectStore
+from schedule_format import Schedule, day_ordinal, output_format
+from schedule_instrumentation import progress, span
+
+# Written next to the JSON schedule when SCHEDULE_OUTPUT_FORMAT=binary
+BINARY_OUTPUT_FILE = 'detailed_schedule_with_child_tasks.schd'
+
+# 'slots' places every task in a 7-day slot per sequence number, 'productivity'
+# sizes each task from its volume, area and object count (productivity_rates.json)
+DURATION_MODEL = os.environ.get('SCHEDULE_DURATION_MODEL', 'slots')
 
 def load_label_sequences():
     """Load the label sequence mapping file"""
@@ -17,8 +30,11 @@ def load_label_sequences():
         print("Error: label_object_sequenced.json not found")
         return None
 
-def load_classification_results():
-    """Load the classification results file"""
+def load_classification_results(label_sequences=None):
+    """
+    Load the classification results file, without duplicate objects and
+    codes unknown to the label sequences (see normalize_objects.py)
+    """
     try:
         # Try multiple possible locations for the classification file
         possible_paths = [
@@ -29,8 +45,7 @@ def load_classification_results():
         
         for path in possible_paths:
             if os.path.exists(path):
-                with open(path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                return list(iter_clean_objects(path, label_sequences))
         
         print("Error: classification_results_bim_gemini_20250612_095607.json not found in any expected location")
         return None
@@ -38,23 +53,24 @@ def load_classification_results():
         print(f"Error loading classification results: {e}")
         return None
 
-def create_schedule():
-    """Create a schedule based on object codes and sequences"""
-    print("Loading data files...")
-    
-    # Load the sequence mapping
-    label_sequences = load_label_sequences()
-    if not label_sequences:
-        return
-    
-    # Load the classification results
-    classification_results = load_classification_results()
-    if not classification_results:
-        return
-    
-    print(f"Found {len(label_sequences)} sequence mappings")
-    print(f"Found {len(classification_results)} classified objects")
+def count_objects_by_code(classification_results):
+    """Count classified objects per label code in a single pass"""
+    return Counter(result['label'] for result in classification_results if 'label' in result)
+
+def estimate_task_durations(store=None, classification_results=None):
+    """Estimate the duration of each object code from the store's aggregates or the classification results"""
+    table = ProductivityTable(load_productivity_table())
+    aggregates = store.code_aggregates() if store else aggregate_objects_by_code(classification_results)
+    return DurationEstimator(table, store).estimate(aggregates)
+
+def build_schedule_tasks(label_sequences, code_counts, durations=None, base_date=None):
+    """
+    Build one schedule task per object code, placed by its sequence number.
     
+    Tasks last one 7-day slot unless durations (from estimate_task_durations) are given.
+    The first slot starts on base_date (1 January 2024 by default). With durations,
+    each sequence starts the day after the latest task of the previous one ends.
+    """
     # Create a mapping of codes to their full information
     code_mapping = {}
     for code, info in label_sequences.items():
@@ -64,36 +80,44 @@ def create_schedule():
         }
     
     # Collect all unique object codes from classification results
-    unique_codes = set()
-    for result in classification_results:
-        if 'label' in result:
-            unique_codes.add(result['label'])
-    
-    print(f"Found {len(unique_codes)} unique object codes")
+    unique_codes = set(code_counts)
     
     # Create schedule tasks
     schedule_tasks = []
-    base_date = datetime(2024, 1, 1)  # Starting date
+    base_date = base_date or datetime(2024, 1, 1)  # Starting date
     days_per_sequence = 7  # Each sequence number represents a week
     
     # Sort codes by their sequence number
     sorted_codes = sorted(unique_codes, 
                          key=lambda x: code_mapping.get(x, {}).get('sequence', 999))
     
+    current_sequence = None
+    sequence_start = base_date
+    latest_end = None
+    
     for code in sorted_codes:
         if code in code_mapping:
             sequence = code_mapping[code]['sequence']
             description = code_mapping[code]['description']
             
             # Calculate start and end dates based on sequence
-            start_date = base_date + timedelta(days=(sequence - 1) * days_per_sequence)
-            end_date = start_date + timedelta(days=days_per_sequence - 1)
+            if durations:
+                if sequence != current_sequence:
+                    current_sequence = sequence
+                    if latest_end is not None:
+                        sequence_start = latest_end + timedelta(days=1)
+                start_date = sequence_start
+            else:
+                start_date = base_date + timedelta(days=(sequence - 1) * days_per_sequence)
+            duration = durations[code]['duration'] if durations and code in durations else days_per_sequence
+            end_date = start_date + timedelta(days=duration - 1)
+            if latest_end is None or end_date > latest_end:
+                latest_end = end_date
             
             # Count objects with this code
-            object_count = sum(1 for result in classification_results 
-                             if result.get('label') == code)
+            object_count = code_counts[code]
             
-            schedule_tasks.append({
+            task = {
                 'task_id': code,
                 'object_description': description,
                 'object_code': code,
@@ -103,15 +127,88 @@ def create_schedule():
                 'end_date': end_date.strftime('%a %d.%m.%y'),
                 'object_count': object_count,
                 'is_child': True
-            })
+            }
+            if durations and code in durations:
+                task['duration'] = duration
+                task['trade'] = durations[code]['trade']
+            schedule_tasks.append(task)
     
     # Sort tasks by sequence
     schedule_tasks.sort(key=lambda x: x['sequence'])
     
+    return schedule_tasks
+
+def load_from_store(store):
+    """Load reference codes and per-code object counts from the project store"""
+    label_sequences = store.reference_codes() or load_label_sequences()
+    return label_sequences, store.code_counts()
+
+def create_schedule(store_path=None):
+    """
+    Create a schedule based on object codes and sequences.
+    
+    With store_path, object counts are aggregated in the SQLite project store
+    instead of loading the classification results file.
+    """
+    print("Loading data files...")
+    
+    store = ProjectStore(store_path) if store_path else None
+    
+    if store:
+        with span('query project store'):
+            label_sequences, code_counts = load_from_store(store)
+        if not label_sequences or not code_counts:
+            print("Error: project store contains no reference codes or objects")
+            store.close()
+            return
+        total_objects = sum(code_counts.values())
+    else:
+        # Load the sequence mapping
+        with span('load reference data'):
+            label_sequences = load_label_sequences()
+        if not label_sequences:
+            return
+        
+        # Load the classification results
+        with span('ingest objects'):
+            classification_results = load_classification_results(label_sequences)
+            if classification_results:
+                code_counts = count_objects_by_code(classification_results)
+        if not classification_results:
+            return
+        total_objects = len(classification_results)
+    
+    print(f"Found {len(label_sequences)} sequence mappings")
+    print(f"Found {total_objects} classified objects")
+    print(f"Found {len(code_counts)} unique object codes")
+    progress('objects ingested', objects=total_objects, codes=len(code_counts))
+    
+    durations = None
+    if DURATION_MODEL == 'productivity':
+        with span('estimate durations'):
+            durations = estimate_task_durations(store, None if store else classification_results)
+        progress('durations estimated', codes=len(durations))
+    
+    with span('build tasks'):
+        schedule_tasks = build_schedule_tasks(label_sequences, code_counts, durations)
+    progress('tasks built', tasks=len(schedule_tasks))
+    
     # Save the schedule in the format expected by the Gantt chart script
     output_file = 'detailed_schedule_with_child_tasks.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(schedule_tasks, f, indent=2, ensure_ascii=False)
+    with span('write schedule'):
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(schedule_tasks, f, indent=2, ensure_ascii=False)
+        # Compact copy for the API routes, which read it instead of the JSON file
+        if output_format() == 'binary':
+            with open(BINARY_OUTPUT_FILE, 'wb') as f:
+                f.write(Schedule.from_tasks(schedule_tasks).to_bytes())
+    
+    if store:
+        with span('record schedule run'):
+            run_id = store.record_schedule_run(schedule_tasks, source='bim',
+                                               params={'duration_model': DURATION_MODEL})
+        store.close()
+        print(f"Recorded schedule run {run_id} in: {store_path}")
     
     print(f"\nSchedule generated with {len(schedule_tasks)} tasks")
     print(f"Saved to: {output_file}")
@@ -122,7 +219,8 @@ def create_schedule():
     print("\nSchedule Summary:")
     print("=" * 80)
     print(f"Total number of tasks: {len(schedule_tasks)}")
-    print(f"Date range: {schedule_tasks[0]['start_date']} to {schedule_tasks[-1]['end_date']}")
+    last_task = max(schedule_tasks, key=lambda task: day_ordinal(task['end_date']))
+    print(f"Date range: {schedule_tasks[0]['start_date']} to {last_task['end_date']}")
     print(f"Total objects: {df['object_count'].sum()}")
     print("\nTasks by sequence:")
     print(df[['task_id', 'object_description', 'sequence', 'object_count', 'start_date', 'end_date']].to_string(index=False))
@@ -130,4 +228,4 @@ def create_schedule():
     return schedule_tasks
 
 if __name__ == "__main__":
-    create_schedule() 
\ No newline at end of file
+    create_schedule(store_path=os.environ.get('SCHEDULE_STORE')) 
\ No newline at end of file
@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import sys
+from typing import Iterable, List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from build_mapping_coverage import code_prefixes
+from normalize_objects import iter_clean_objects, load_catalog_codes
+from project_store import ProjectStore, normalize_object
+
+DEFAULT_RATES_FILE = 'productivity_rates.json'
+
+# Quantities of a code aggregate and the productivity rate dividing each of them
+RATE_FIELDS = (
+    ('volume', 'volume_per_day'),
+    ('area', 'area_per_day'),
+    ('object_count', 'units_per_day')
+)
+
+
+def load_productivity_table(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the productivity table, by default from the working directory or next to this module"""
+    if path is None:
+        path = DEFAULT_RATES_FILE
+        if not os.path.exists(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_RATES_FILE)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _fingerprint(data) -> str:
+    text = json.dumps(data, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def aggregates_fingerprint(aggregates: Iterable[Dict[str, Any]]) -> str:
+    """Identify a model revision by its per-code object count, volume and area"""
+    rows = sorted(
+        (row['label_code'], row['object_count'], round(row['volume'] or 0.0, 6), round(row['area'] or 0.0, 6))
+        for row in aggregates
+    )
+    return _fingerprint(rows)
+
+
+class ProductivityTable:
+    """
+    Productivity rates keyed on code prefixes (see productivity_rates.json).
+
+    The most specific entry along a code's hierarchy applies as a whole
+    (EL.07.02 -> EL.07 -> EL); codes without an entry use the default rates.
+    Without a units_per_day rate the global objects_per_day applies.
+    """
+
+    def __init__(self, table: Dict[str, Any]):
+        self.rates = table.get('rates', {})
+        self.default = table.get('default', {})
+        self.objects_per_day = table.get('objects_per_day', 20)
+        self.minimum_days = table.get('minimum_days', 1)
+        self.fingerprint = _fingerprint(table)
+        self._resolved = {}
+
+    def resolve(self, code: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """Return the prefix whose entry applies to the code (None for the default) and the entry"""
+        resolved = self._resolved.get(code)
+        if resolved is None:
+            resolved = (None, self.default)
+            for prefix in code_prefixes(code):
+                if prefix in self.rates:
+                    resolved = (prefix, self.rates[prefix])
+                    break
+            self._resolved[code] = resolved
+        return resolved
+
+
+def estimate_durations(aggregates: Iterable[Dict[str, Any]],
+                       table: ProductivityTable) -> Dict[str, Dict[str, Any]]:
+    """
+    Estimate the duration of every code from its aggregated quantities.
+
+    Each code's rates are resolved once; the durations of all codes are then
+    computed together as
+
+        days = max(volume / volume_per_day, area / area_per_day,
+                   object_count / units_per_day, minimum_days)
+
+    with quantities that have no rate left out, rounded to whole days.
+
+    Args:
+        aggregates: Rows with label_code, object_count, volume and area
+            (ProjectStore.code_aggregates() format)
+        table: Productivity table to apply
+
+    Returns:
+        Mapping of code to its duration in days, unrounded days, trade and the
+        table entry that was applied
+    """
+    aggregates = list(aggregates)
+    codes = [row['label_code'] for row in aggregates]
+    resolved = [table.resolve(code) for code in codes]
+
+    days = np.full(len(codes), float(table.minimum_days))
+    for quantity, rate_field in RATE_FIELDS:
+        quantities = np.array([row[quantity] or 0.0 for row in aggregates], dtype=float)
+        # Quantities without a rate divide by infinity and contribute nothing
+        rates = np.array([entry.get(rate_field) or np.inf for _, entry in resolved], dtype=float)
+        if rate_field == 'units_per_day':
+            rates = np.where(np.isinf(rates), float(table.objects_per_day), rates)
+        np.maximum(days, quantities / rates, out=days)
+
+    # Round half up like the planner UI (Math.round)
+    durations = np.floor(days + 0.5).astype(int)
+
+    return {
+        code: {
+            'duration': int(duration),
+            'days': round(float(raw_days), 3),
+            'trade': entry.get('trade'),
+            'rate_code': rate_code
+        }
+        for code, duration, raw_days, (rate_code, entry) in zip(codes, durations, days, resolved)
+    }
+
+
+class DurationEstimator:
+    """
+    Estimates code durations, cached per model revision.
+
+    A revision is identified by the fingerprint of its code aggregates together
+    with the productivity table, so estimates are recomputed only when the model
+    or the rates change. With a project store the cache persists between runs.
+    """
+
+    def __init__(self, table: ProductivityTable, store=None):
+        self.table = table
+        self.store = store
+        self._cache = {}
+
+    def cache_key(self, aggregates: List[Dict[str, Any]]) -> str:
+        return f"{aggregates_fingerprint(aggregates)}:{self.table.fingerprint}"
+
+    def estimate(self, aggregates: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        aggregates = list(aggregates)
+        key = self.cache_key(aggregates)
+
+        estimates = self._cache.get(key)
+        if estimates is None and self.store is not None:
+            estimates = self.store.duration_estimates(key) or None
+        if estimates is None:
+            estimates = estimate_durations(aggregates, self.table)
+            if self.store is not None:
+                self.store.save_duration_estimates(key, estimates)
+        self._cache[key] = estimates
+        return estimates
+
+
+def aggregate_objects_by_code(classification_results: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aggregate object count, volume and area per label code in a single pass"""
+    totals = {}
+    for result in classification_results:
+        obj = normalize_object(result)
+        if not obj['label_code']:
+            continue
+        total = totals.setdefault(obj['label_code'], [0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += obj['volume'] or 0.0
+        total[2] += obj['area'] or 0.0
+    return [
+        {'label_code': code, 'object_count': count, 'volume': volume, 'area': area}
+        for code, (count, volume, area) in sorted(totals.items())
+    ]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estimate task durations per object code from productivity rates")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--objects', help="Classification results JSON file")
+    source.add_argument('--store', help="Read the code aggregates from a SQLite project store")
+    parser.add_argument('--rates', help="Productivity table JSON file (default: productivity_rates.json)")
+    parser.add_argument('--output', help="Write the estimates to this JSON file")
+    args = parser.parse_args()
+
+    for path in (args.objects or args.store, args.rates):
+        if path and not os.path.exists(path):
+            print(f"Error: Input file '{path}' not found")
+            sys.exit(1)
+
+    table = ProductivityTable(load_productivity_table(args.rates))
+    if args.store:
+        with ProjectStore(args.store) as store:
+            estimates = DurationEstimator(table, store).estimate(store.code_aggregates())
+    else:
+        objects = iter_clean_objects(args.objects, load_catalog_codes())
+        estimates = DurationEstimator(table).estimate(aggregate_objects_by_code(objects))
+
+    print(f"Estimated durations for {len(estimates)} codes")
+    for code, estimate in sorted(estimates.items()):
+        print(f"   • {code}: {estimate['duration']} days ({estimate['trade']}, rate {estimate['rate_code'] or 'default'})")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(estimates, f, indent=2, ensure_ascii=False)
+        print(f"Estimates saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import json
+import os
+import sys
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, Optional, Tuple
+
+from build_mapping_coverage import code_prefixes
+from schedule_format import day_ordinal, iso_day
+from schedule_instrumentation import progress, span
+
+OUTPUT_FILE = 'gantt_rollups.json'
+VIEWS = ('phase', 'code', 'sequence', 'time')
+
+# Phase of tasks that have none, matching transformScheduleData
+DEFAULT_PHASE = 'Construction'
+
+
+def normalize_task(task: Dict[str, Any], index: int) -> Optional[Dict[str, Any]]:
+    """
+    Convert a schedule task (pipeline or frontend format) into a Gantt leaf row.
+
+    Returns None for tasks without a usable start date.
+    """
+    # Days are kept as ordinals so spans aggregate with integer min/max
+    start = day_ordinal(task.get('start_date'))
+    if start is None:
+        return None
+    end = day_ordinal(task.get('end_date'))
+    duration = task.get('duration')
+    if end is None or end < start:
+        end = start + max(int(duration or 7), 1) - 1
+    if not duration:
+        duration = end - start + 1
+
+    return {
+        'id': str(task.get('id') or task.get('task_id') or f"task-{index}"),
+        'text': task.get('name') or task.get('object_description') or task.get('task_name') or f"Task {index + 1}",
+        'start': start,
+        'end': end,
+        'duration': duration,
+        'phase': task.get('phase') or DEFAULT_PHASE,
+        'object_code': task.get('object_code'),
+        'object_count': task.get('object_count') or 0,
+        'sequence': task.get('sequence')
+    }
+
+
+def phase_path(task, catalog):
+    return [(task['phase'], task['phase'])]
+
+
+def code_path(task, catalog, cache):
+    """Group by the code hierarchy above the task's own code; tasks without a code group by phase"""
+    code = task['object_code']
+    if not code:
+        return [(f"phase:{task['phase']}", task['phase'])]
+    path = cache.get(code)
+    if path is not None:
+        return path
+    path = []
+    for prefix in reversed(code_prefixes(code)[1:]):
+        description = catalog.get(prefix, {}).get('description')
+        path.append((prefix, f"{prefix} {description}" if description and description != prefix else prefix))
+    path = cache[code] = path or [(code, code)]
+    return path
+
+
+def sequence_path(task, catalog):
+    sequence = task['sequence']
+    if sequence is None:
+        return [('none', 'No sequence')]
+    return [(f"{sequence:04d}" if isinstance(sequence, int) else str(sequence), f"Sequence {sequence}")]
+
+
+@lru_cache(maxsize=None)
+def _time_bucket(ordinal, bucket):
+    day = date.fromordinal(ordinal)
+    if bucket == 'week':
+        year, week, _ = day.isocalendar()
+        return [(f"{year}-W{week:02d}", f"Week {week}, {year}")]
+    return [(day.strftime('%Y-%m'), day.strftime('%B %Y'))]
+
+
+def time_path(task, catalog, bucket='month'):
+    return _time_bucket(task['start'], bucket)
+
+
+def build_view(view: str, tasks: List[Dict[str, Any]],
+               path: Callable[[Dict[str, Any]], List[Tuple[str, str]]]) -> Dict[str, Any]:
+    """
+    Build the roll-up tree of one view.
+
+    Every group node carries the span (earliest start, latest end), task count
+    and object count of all tasks below it, so any level can be shown without
+    its children.
+
+    Returns:
+        Dictionary with the root node ids and the nodes by id; leaves are
+        referenced by task id only.
+    """
+    nodes = {}
+    roots = []
+
+    for task in tasks:
+        parent = None
+        for key, label in path(task):
+            node_id = f"{view}:{key}"
+            node = nodes.get(node_id)
+            if node is None:
+                node = nodes[node_id] = {
+                    'id': node_id, 'text': label, 'parent': parent, 'start': task['start'], 'end': task['end'],
+                    'task_count': 0, 'object_count': 0, 'children': [], 'sort_key': key
+                }
+                if parent is None:
+                    roots.append(node_id)
+                else:
+                    nodes[parent]['children'].append(node_id)
+            if task['start'] < node['start']:
+                node['start'] = task['start']
+            if task['end'] > node['end']:
+                node['end'] = task['end']
+            node['task_count'] += 1
+            node['object_count'] += task['object_count']
+            parent = node_id
+        if parent is None:
+            roots.append(task['id'])
+        else:
+            nodes[parent]['children'].append(task['id'])
+
+    def order(ids):
+        # Groups by their earliest start, then key; leaves keep schedule order after them
+        groups = sorted((i for i in ids if i in nodes), key=lambda i: (nodes[i]['start'], nodes[i]['sort_key']))
+        return groups + [i for i in ids if i not in nodes]
+
+    for node in nodes.values():
+        node['children'] = order(node['children'])
+    roots = order(roots)
+
+    return {
+        'roots': roots,
+        'nodes': {
+            node_id: {
+                'id': node_id,
+                'text': node['text'],
+                'parent': node['parent'],
+                'start_date': iso_day(node['start']),
+                'end_date': iso_day(node['end']),
+                'duration': node['end'] - node['start'] + 1,
+                'task_count': node['task_count'],
+                'object_count': node['object_count'],
+                'children': node['children']
+            }
+            for node_id, node in nodes.items()
+        }
+    }
+
+
+def build_rollups(schedule: List[Dict[str, Any]], catalog: Dict[str, Dict[str, Any]],
+                  time_bucket: str = 'month') -> Dict[str, Any]:
+    """
+    Precompute all roll-up views of a schedule.
+
+    Returns:
+        Dictionary with the views (roots and group nodes) and the leaf tasks by id
+    """
+    tasks = []
+    seen_ids = set()
+    for index, raw in enumerate(schedule):
+        task = normalize_task(raw, index)
+        if task is None:
+            continue
+        # Leaf ids must be unique across the views
+        if task['id'] in seen_ids:
+            task['id'] = f"{task['id']}#{index}"
+        seen_ids.add(task['id'])
+        tasks.append(task)
+
+    # Code paths are resolved once per code for this schedule
+    code_cache = {}
+    paths = {
+        'phase': lambda task: phase_path(task, catalog),
+        'code': lambda task: code_path(task, catalog, code_cache),
+        'sequence': lambda task: sequence_path(task, catalog),
+        'time': lambda task: time_path(task, catalog, time_bucket)
+    }
+    views = {view: build_view(view, tasks, paths[view]) for view in VIEWS}
+
+    leaves = {
+        task['id']: {
+            'id': task['id'],
+            'text': task['text'],
+            'start_date': iso_day(task['start']),
+            'duration': task['duration'],
+            'phase': task['phase'],
+            'object_code': task['object_code'],
+            'object_count': task['object_count']
+        }
+        for task in tasks
+    }
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'time_bucket': time_bucket,
+        'task_count': len(tasks),
+        'views': views,
+        'tasks': leaves
+    }
+
+
+def load_catalog():
+    for path in ('label_object_sequenced.json', '../label_object_sequenced.json'):
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    return {}
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute aggregated Gantt views of a schedule")
+    parser.add_argument('input_file', nargs='?', help="Schedule JSON file (read from stdin when omitted)")
+    parser.add_argument('--output', default=OUTPUT_FILE)
+    parser.add_argument('--time-bucket', choices=('week', 'month'), default='month')
+    args = parser.parse_args()
+
+    with span('parse schedule'):
+        if args.input_file:
+            if not os.path.exists(args.input_file):
+                print(f"Error: Input file '{args.input_file}' not found")
+                sys.exit(1)
+            with open(args.input_file, 'r', encoding='utf-8') as f:
+                schedule = json.load(f)
+        else:
+            schedule = json.load(sys.stdin)
+
+    with span('build rollups'):
+        rollups = build_rollups(schedule, load_catalog(), args.time_bucket)
+    progress('rollups built', tasks=rollups['task_count'])
+
+    with span('write rollups'):
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(rollups, f, ensure_ascii=False, separators=(',', ':'))
+
+    print(f"Rolled up {rollups['task_count']} tasks into {len(VIEWS)} views")
+    for view, data in rollups['views'].items():
+        print(f"   • {view}: {len(data['roots'])} top-level rows, {len(data['nodes'])} groups")
+    print(f"Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
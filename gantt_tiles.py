@@ -0,0 +1,185 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Callable, Iterable, List, Dict, Any, Optional, Tuple
+
+MANIFEST_FILE = 'gantt_tiles_manifest.json'
+
+# Bump when the tile drawing changes so all tiles are rendered again
+RENDER_VERSION = 1
+
+
+class IntervalIndex:
+    """
+    Index of [start, end] day intervals bucketed on a fixed grid.
+
+    Each interval is registered in every bucket it overlaps, so the intervals
+    overlapping a bucket are found without scanning all of them. Days are
+    date ordinals.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[int, int]], origin: int, bucket_days: int):
+        self.origin = origin
+        self.bucket_days = bucket_days
+        self.buckets: Dict[int, List[int]] = {}
+        self.intervals = list(intervals)
+        for position, (start, end) in enumerate(self.intervals):
+            for bucket in range(self.bucket_of(start), self.bucket_of(end) + 1):
+                self.buckets.setdefault(bucket, []).append(position)
+
+    def bucket_of(self, day: int) -> int:
+        return (day - self.origin) // self.bucket_days
+
+    def bucket_range(self, bucket: int) -> Tuple[int, int]:
+        """Return the first and last day of a bucket"""
+        first = self.origin + bucket * self.bucket_days
+        return first, first + self.bucket_days - 1
+
+    def overlapping(self, bucket: int) -> List[int]:
+        """Return the positions of the intervals overlapping a bucket, in insertion order"""
+        return self.buckets.get(bucket, [])
+
+    def query(self, start: int, end: int) -> List[int]:
+        """Return the positions of the intervals overlapping [start, end]"""
+        found = set()
+        for bucket in range(self.bucket_of(start), self.bucket_of(end) + 1):
+            for position in self.buckets.get(bucket, ()):
+                interval_start, interval_end = self.intervals[position]
+                if interval_start <= end and interval_end >= start:
+                    found.add(position)
+        return sorted(found)
+
+
+def tile_hash(rows: List[Dict[str, Any]], window: Tuple[int, int], settings: Dict[str, Any]) -> str:
+    """Hash of everything drawn on a tile"""
+    payload = json.dumps([RENDER_VERSION, settings, window, rows], sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def plan_tiles(tasks: List[Dict[str, Any]], period_days: int = 90,
+               rows_per_page: int = 20) -> List[Dict[str, Any]]:
+    """
+    Split a schedule into time x task-row tiles.
+
+    Every task with a valid span appears on every period it overlaps, and each
+    period's tasks are split into pages of rows_per_page rows, so no task is
+    dropped. Periods are numbered by their window from the earliest start, so
+    windows without tasks leave gaps and do not renumber later tiles.
+
+    Args:
+        tasks: Tasks with 'parsed_start' and 'parsed_end' datetimes
+        period_days: Length of a tile's time window
+        rows_per_page: Task rows per tile
+
+    Returns:
+        Tiles with their period, page, window and tasks
+    """
+    if not tasks:
+        return []
+
+    spans = [(task['parsed_start'].toordinal(), task['parsed_end'].toordinal()) for task in tasks]
+    origin = min(start for start, _ in spans)
+    index = IntervalIndex(spans, origin, period_days)
+
+    tiles = []
+    for bucket in sorted(index.buckets):
+        period = bucket + 1
+        window = index.bucket_range(bucket)
+        positions = sorted(index.overlapping(bucket), key=lambda p: (spans[p][0], str(tasks[p].get('task_id', ''))))
+        for page_number, first in enumerate(range(0, len(positions), rows_per_page), start=1):
+            tiles.append({
+                'id': f"p{period:03d}_r{page_number:02d}",
+                'period': period,
+                'page': page_number,
+                'window': window,
+                'tasks': [tasks[p] for p in positions[first:first + rows_per_page]]
+            })
+    return tiles
+
+
+def export_gantt_tiles(tasks: List[Dict[str, Any]],
+                       render_tile: Callable[[Dict[str, Any], str], None],
+                       describe_row: Callable[[Dict[str, Any]], Dict[str, Any]],
+                       output_dir: str = '.', period_days: int = 90, rows_per_page: int = 20,
+                       force: bool = False, file_pattern: str = 'gantt_period_{period}_page_{page}.png',
+                       render_settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Render the tiles of a schedule, skipping tiles whose content did not change.
+
+    The tile manifest of the previous export records a content hash per tile;
+    a tile is rendered again only when its hash differs or its file is gone.
+    Files of tiles that no longer exist are removed.
+
+    Args:
+        tasks: Tasks with 'parsed_start' and 'parsed_end' datetimes
+        render_tile: Draws a tile (with its window as datetimes) into the given file
+        describe_row: Returns what is drawn for a task row, used for the content hash
+        output_dir: Directory of the tiles and the manifest
+        force: Render all tiles regardless of the manifest
+        render_settings: Additional settings that change the drawing (e.g. dpi)
+
+    Returns:
+        The new manifest, with the number of rendered and reused tiles
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE)
+    previous = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                previous = {tile['id']: tile for tile in json.load(f).get('tiles', [])}
+        except (json.JSONDecodeError, OSError):
+            previous = {}
+
+    settings = {'period_days': period_days, 'rows_per_page': rows_per_page, **(render_settings or {})}
+    tiles = plan_tiles(tasks, period_days, rows_per_page)
+    entries = []
+    rendered = reused = 0
+
+    for tile in tiles:
+        rows = [describe_row(task) for task in tile['tasks']]
+        content_hash = tile_hash(rows, tile['window'], settings)
+        filename = file_pattern.format(period=tile['period'], page=tile['page'])
+        path = os.path.join(output_dir, filename)
+
+        old = previous.get(tile['id'])
+        if (not force and old and old.get('hash') == content_hash and old.get('file') == filename
+                and os.path.exists(path)):
+            reused += 1
+        else:
+            render_tile({**tile, 'window': tuple(datetime.fromordinal(day) for day in tile['window'])}, path)
+            rendered += 1
+
+        entries.append({
+            'id': tile['id'],
+            'file': filename,
+            'period': tile['period'],
+            'page': tile['page'],
+            'window_start': datetime.fromordinal(tile['window'][0]).strftime('%Y-%m-%d'),
+            'window_end': datetime.fromordinal(tile['window'][1]).strftime('%Y-%m-%d'),
+            'rows': len(rows),
+            'task_ids': [row.get('task_id') for row in rows],
+            'hash': content_hash
+        })
+
+    # Tiles of the previous export that no longer exist
+    current_files = {entry['file'] for entry in entries}
+    removed = 0
+    for old in previous.values():
+        stale = os.path.join(output_dir, old.get('file', ''))
+        if old.get('file') and old['file'] not in current_files and os.path.exists(stale):
+            os.remove(stale)
+            removed += 1
+
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'render_version': RENDER_VERSION,
+        'settings': settings,
+        'task_count': len(tasks),
+        'tiles': entries
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    return {**manifest, 'rendered': rendered, 'reused': reused, 'removed': removed}
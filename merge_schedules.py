@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+from typing import List, Dict, Any, Optional
+
+from schedule_format import Schedule, day_ordinal, format_day, load_schedule, output_format, parse_schedule
+from schedule_instrumentation import progress, span
+
+BIM_SCHEDULE_FILE = 'detailed_schedule_with_child_tasks.json'
+
+# BIM tasks that follow a construction phase when its planner section is enabled:
+# (top-level object code, planner section, construction phase)
+PHASE_ANCHORS = (
+    ('KO', 'structure', 'Excavation'),
+    ('FI', 'fitout', 'Structure'),
+)
+
+
+def phase_end_index(tasks: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Return the last day of every phase as date ordinal, in one pass over the tasks"""
+    ends = {}
+    for task in tasks:
+        phase = task.get('phase')
+        end = day_ordinal(task.get('end_date'))
+        if phase and end is not None and (phase not in ends or end > ends[phase]):
+            ends[phase] = end
+    return ends
+
+
+def phase_offsets(bim_tasks: List[Dict[str, Any]], starts: List[Optional[int]],
+                  phase_ends: Dict[str, int], params: Dict[str, Any]) -> Dict[str, int]:
+    """
+    Return the shift in days of the BIM tasks of each anchored code.
+
+    A code's tasks move together so that the earliest of them starts the day
+    after its construction phase ends, less the section's overlap; their order
+    and durations are kept.
+    """
+    first_start = {}
+    for task, start in zip(bim_tasks, starts):
+        if start is None:
+            continue
+        prefix = (task.get('object_code') or '').split('.')[0]
+        if prefix not in first_start or start < first_start[prefix]:
+            first_start[prefix] = start
+
+    offsets = {}
+    for prefix, section, phase in PHASE_ANCHORS:
+        settings = params.get(section) or {}
+        if settings.get('enabled') and phase in phase_ends and prefix in first_start:
+            anchor = phase_ends[phase] + 1 - int(settings.get('overlap') or 0)
+            offsets[prefix] = anchor - first_start[prefix]
+    return offsets
+
+
+def merge_schedules(construction_tasks: List[Dict[str, Any]], bim_tasks: List[Dict[str, Any]],
+                    params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Merge the construction phases and the BIM schedule into one schedule ordered by start date.
+
+    BIM tasks are shifted behind the construction phases they follow (see
+    PHASE_ANCHORS). Dates are parsed once into day numbers; tasks without a
+    start date go last, and tasks starting on the same day keep their order,
+    construction phases first.
+    """
+    phase_ends = phase_end_index(construction_tasks)
+    bim_starts = [day_ordinal(task.get('start_date')) for task in bim_tasks]
+    offsets = phase_offsets(bim_tasks, bim_starts, phase_ends, params)
+
+    merged = list(construction_tasks)
+    starts = [day_ordinal(task.get('start_date')) for task in construction_tasks]
+    for task, start in zip(bim_tasks, bim_starts):
+        offset = offsets.get((task.get('object_code') or '').split('.')[0])
+        if offset and start is not None:
+            task = dict(task)
+            start += offset
+            task['start_date'] = format_day(start)
+            end = day_ordinal(task.get('end_date'))
+            if end is not None:
+                task['end_date'] = format_day(end + offset)
+        merged.append(task)
+        starts.append(start)
+
+    order = sorted(range(len(merged)), key=lambda i: (starts[i] is None, starts[i] or 0, i))
+    return [merged[i] for i in order]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge the construction phases and the BIM schedule")
+    parser.add_argument('params', help="Planner parameters as JSON")
+    parser.add_argument('--construction', help="Construction schedule file (read from stdin when omitted)")
+    parser.add_argument('--bim', default=BIM_SCHEDULE_FILE, help="BIM schedule file (JSON or binary)")
+    parser.add_argument('--output', help="Write the merged schedule to this file instead of stdout")
+    args = parser.parse_args()
+
+    try:
+        params = json.loads(args.params)
+    except json.JSONDecodeError as e:
+        print(f"Error: Invalid JSON parameters: {e}")
+        sys.exit(1)
+
+    for path in (args.construction, args.bim):
+        if path and not os.path.exists(path):
+            print(f"Error: Input file '{path}' not found")
+            sys.exit(1)
+
+    with span('load schedules'):
+        if args.construction:
+            construction_tasks = load_schedule(args.construction)
+        else:
+            construction_tasks = parse_schedule(sys.stdin.buffer.read())
+        bim_tasks = load_schedule(args.bim)
+
+    with span('merge schedules'):
+        merged = merge_schedules(construction_tasks, bim_tasks, params)
+    progress('schedules merged', tasks=len(merged))
+
+    with span('serialize schedule'):
+        if output_format() == 'binary':
+            data = Schedule.from_tasks(merged).to_bytes()
+        else:
+            data = json.dumps(merged, indent=2, ensure_ascii=False).encode('utf-8')
+        if args.output:
+            with open(args.output, 'wb') as f:
+                f.write(data)
+        else:
+            sys.stdout.buffer.write(data)
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import json
+import os
+import sys
+import time
+from typing import Iterable, List, Dict, Any, Optional
+
+from normalize_objects import ObjectValidator, iter_records, load_catalog_codes
+from project_store import ProjectStore, normalize_object, object_hash
+
+
+def diff_objects(store: ProjectStore, records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Compare a new classification export against the stored revision by GlobalId.
+
+    Each object in the export is hashed and compared with the persisted hash
+    index, so unchanged objects cost one dictionary lookup. Objects without a
+    GlobalId cannot be matched between revisions and are skipped.
+
+    Returns:
+        Dictionary with the added, removed, relabelled and modified objects plus counts
+    """
+    index = store.object_index()
+    seen = set()
+    added, relabelled, modified = [], [], []
+    unchanged = duplicates = unkeyed = 0
+
+    for record in records:
+        obj = normalize_object(record)
+        global_id = obj['global_id']
+        if not global_id or not obj['label_code']:
+            unkeyed += 1
+            continue
+        if global_id in seen:
+            duplicates += 1
+            continue
+        seen.add(global_id)
+
+        previous = index.pop(global_id, None)
+        if previous is None:
+            added.append(obj)
+        elif previous[0] != obj['label_code']:
+            relabelled.append(obj)
+        elif previous[1] != object_hash(obj):
+            modified.append(obj)
+        else:
+            unchanged += 1
+
+    # Whatever is left in the index no longer exists in the export
+    removed = list(index)
+
+    return {
+        'added': added,
+        'removed': removed,
+        'relabelled': relabelled,
+        'modified': modified,
+        'counts': {
+            'added': len(added),
+            'removed': len(removed),
+            'relabelled': len(relabelled),
+            'modified': len(modified),
+            'unchanged': unchanged,
+            'duplicates': duplicates,
+            'unkeyed': unkeyed
+        }
+    }
+
+
+def aggregate_deltas(diff: Dict[str, Any], previous: Dict[str, Dict[str, Any]]) -> Dict[str, List[float]]:
+    """
+    Compute the per-code [count, volume, area] changes of a diff.
+
+    Args:
+        diff: Result of diff_objects()
+        previous: Stored state of the removed, relabelled and modified objects
+    """
+    deltas = {}
+
+    def apply(code, sign, obj):
+        delta = deltas.setdefault(code, [0, 0.0, 0.0])
+        delta[0] += sign
+        delta[1] += sign * (obj['volume'] or 0.0)
+        delta[2] += sign * (obj['area'] or 0.0)
+
+    for obj in diff['added']:
+        apply(obj['label_code'], 1, obj)
+    for global_id in diff['removed']:
+        old = previous[global_id]
+        apply(old['label_code'], -1, old)
+    for obj in diff['relabelled'] + diff['modified']:
+        old = previous[obj['global_id']]
+        apply(old['label_code'], -1, old)
+        apply(obj['label_code'], 1, obj)
+    return deltas
+
+
+def update_schedule_tasks(store: ProjectStore, affected_codes: Iterable[str],
+                          label_sequences: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, int]:
+    """
+    Update only the tasks of the latest BIM schedule run that changed.
+
+    Tasks are rebuilt from the current code aggregates with the duration model
+    of the run and written only where they differ from the stored ones. With
+    one-slot durations these are the tasks of the affected codes; with
+    productivity durations every code is re-estimated, since a changed
+    duration also moves the tasks of later sequences.
+    """
+    run = store.latest_run('bim')
+    if not run:
+        return {'updated': 0, 'removed': 0, 'added': 0}
+
+    from create_schedule_from_objects import build_schedule_tasks, estimate_task_durations
+
+    code_counts = store.code_counts()
+    affected_codes = set(affected_codes)
+    durations = None
+    if json.loads(run['params'] or '{}').get('duration_model') == 'productivity':
+        durations = estimate_task_durations(store)
+        affected_codes.update(code_counts)
+
+    counts = {code: code_counts[code] for code in affected_codes if code in code_counts}
+    rebuilt = {task['object_code']: task
+               for task in build_schedule_tasks(label_sequences or store.reference_codes(), counts, durations)}
+
+    updated, removed = [], []
+    for entry in store.run_tasks_for_codes(run['run_id'], affected_codes):
+        task = rebuilt.pop(entry['task']['object_code'], None)
+        if task is None:
+            removed.append(entry['position'])
+        elif task != entry['task']:
+            updated.append({'position': entry['position'], 'task': task})
+    added = list(rebuilt.values())
+
+    store.update_run_tasks(run['run_id'], updated, removed, added)
+    return {'updated': len(updated), 'removed': len(removed), 'added': len(added)}
+
+
+def import_revision(store: ProjectStore, records: Iterable[Dict[str, Any]], label: Optional[str] = None,
+                    label_sequences: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Import a new model revision, touching only the objects, aggregates and tasks that changed.
+
+    Returns:
+        Report with the diff counts, affected codes and task updates
+    """
+    diff = diff_objects(store, records)
+
+    changed_ids = diff['removed'] + [obj['global_id'] for obj in diff['relabelled'] + diff['modified']]
+    previous = store.objects_by_global_id(changed_ids)
+    deltas = aggregate_deltas(diff, previous)
+
+    store.apply_object_changes(diff['added'] + diff['relabelled'] + diff['modified'], diff['removed'], deltas)
+    task_changes = update_schedule_tasks(store, deltas.keys(), label_sequences)
+    revision_id = store.record_revision(label, diff['counts'])
+
+    return {
+        'revision_id': revision_id,
+        'revision': label,
+        'counts': diff['counts'],
+        'affected_codes': sorted(deltas),
+        'relabelled': [
+            {'GlobalId': obj['global_id'], 'from': previous[obj['global_id']]['label_code'],
+             'to': obj['label_code']}
+            for obj in diff['relabelled']
+        ],
+        'task_changes': task_changes
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Import a model revision incrementally into the project store")
+    parser.add_argument('input_file', help="Classification results of the new revision (JSON array or NDJSON)")
+    parser.add_argument('--store', default='project_store.db')
+    parser.add_argument('--revision', help="Label of the new revision")
+    parser.add_argument('--report', help="Write the diff report to this JSON file")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_file):
+        print(f"Error: Input file '{args.input_file}' not found")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    with ProjectStore(args.store) as store:
+        # Streamed through the validation stage; nothing is written unless the whole file is read
+        validator = ObjectValidator(store.reference_codes() or load_catalog_codes())
+        try:
+            report = import_revision(store, validator.filter(iter_records(args.input_file)), label=args.revision)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    report['validation'] = dict(validator.counts)
+    report['elapsed_s'] = round(time.perf_counter() - started, 3)
+    print(f"Validated objects: {validator.summary()}")
+
+    counts = report['counts']
+    print(f"Revision {report['revision'] or report['revision_id']} imported in {report['elapsed_s']}s")
+    print(f"   • added: {counts['added']}, removed: {counts['removed']}, "
+          f"relabelled: {counts['relabelled']}, modified: {counts['modified']}, unchanged: {counts['unchanged']}")
+    print(f"   • affected codes: {len(report['affected_codes'])}")
+    print(f"   • tasks updated: {report['task_changes']['updated']}, removed: {report['task_changes']['removed']}, "
+          f"added: {report['task_changes']['added']}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, Iterator, Dict, Any, Optional, Set
+
+from project_store import normalize_object
+from schedule_instrumentation import progress, span
+
+CATALOG_FILE = 'label_object_sequenced.json'
+CLEAN_OBJECTS_FILE = 'classified_objects.ndjson'
+REPORT_FILE = 'object_validation_report.json'
+
+# Examples kept per finding in the report; the counts cover everything
+MAX_SAMPLES = 100
+
+READ_CHUNK = 1 << 20
+_SEPARATORS = re.compile(r'[\s,]*')
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream the objects of a JSON array or NDJSON file without loading the whole file"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(READ_CHUNK)
+        position = _SEPARATORS.match(buffer).end()
+        if buffer[position:position + 1] != '[':
+            # One object per line
+            f.seek(0)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        position += 1
+        while True:
+            position = _SEPARATORS.match(buffer, position).end()
+            if position == len(buffer):
+                more = f.read(READ_CHUNK)
+                if not more:
+                    raise ValueError(f"Unterminated JSON array in '{path}'")
+                buffer, position = more, 0
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as e:
+                # The object continues in the next chunk, unless it already spans a whole one
+                if len(buffer) - position > READ_CHUNK:
+                    raise ValueError(f"Invalid JSON in '{path}' (or an object larger than {READ_CHUNK} bytes): {e}")
+                more = f.read(READ_CHUNK)
+                if not more:
+                    raise
+                buffer, position = buffer[position:] + more, 0
+                continue
+            yield record
+            position = end
+            if position > READ_CHUNK:
+                buffer, position = buffer[position:], 0
+
+
+def load_catalog_codes(path: Optional[str] = None) -> Optional[Set[str]]:
+    """Return the codes of the catalog, by default from the working directory or next to this module (None if missing)"""
+    if path is None:
+        path = CATALOG_FILE
+        if not os.path.exists(path):
+            path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CATALOG_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(json.load(f))
+
+
+class GlobalIdSet:
+    """
+    Open-addressing hash set of GlobalIds, each stored as a 64-bit digest with
+    the index of its label.
+
+    A slot takes 12 bytes instead of a string and set entry per object. Two
+    GlobalIds sharing a digest are unlikely enough (about 1 in 10^7 for a
+    million objects) to be treated as the same object.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        size = 16
+        while size < capacity * 2:
+            size *= 2
+        self._keys = array('Q', bytes(8 * size))
+        self._labels = array('I', bytes(4 * size))
+        self._mask = size - 1
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @staticmethod
+    def digest(global_id: str) -> int:
+        key = int.from_bytes(hashlib.blake2b(global_id.encode('utf-8'), digest_size=8).digest(), 'little')
+        # 0 marks empty slots
+        return key or 1
+
+    def add(self, global_id: str, label: int) -> Optional[int]:
+        """Add a GlobalId with its label index; returns None if it is new, else the label it was added with"""
+        return self._insert(self.digest(global_id), label)
+
+    def _insert(self, key, label):
+        keys, mask = self._keys, self._mask
+        slot = key & mask
+        while True:
+            current = keys[slot]
+            if current == 0:
+                keys[slot] = key
+                self._labels[slot] = label
+                self._count += 1
+                if self._count * 2 > mask:
+                    self._grow()
+                return None
+            if current == key:
+                return self._labels[slot]
+            slot = (slot + 1) & mask
+
+    def _grow(self):
+        keys, labels = self._keys, self._labels
+        self._allocate(self._count * 2)
+        for key, label in zip(keys, labels):
+            if key:
+                self._insert(key, label)
+
+
+class ObjectValidator:
+    """
+    Deduplicates and validates classified objects in a single streaming pass.
+
+    The first occurrence of a GlobalId is kept. Later occurrences are dropped,
+    and flagged as conflicts if they carry a different label. Objects without a
+    label, or with a code the catalog does not know, are dropped too. Memory
+    grows with the number of distinct objects (see GlobalIdSet), not with the
+    size of the input.
+    """
+
+    def __init__(self, catalog: Optional[Iterable[str]] = None, max_samples: int = MAX_SAMPLES):
+        self.catalog = set(catalog) if catalog is not None else None
+        self.max_samples = max_samples
+        self.seen = GlobalIdSet()
+        self.codes = []
+        self._code_index = {}
+        self.counts = Counter({key: 0 for key in ('read', 'kept', 'duplicates', 'conflicting_labels',
+                                                  'unknown_codes', 'missing_label', 'missing_global_id')})
+        self.unknown_codes = Counter()
+        self.conflicts = []
+        self.duplicates = []
+
+    def _label_index(self, code):
+        index = self._code_index.get(code)
+        if index is None:
+            index = self._code_index[code] = len(self.codes)
+            self.codes.append(code)
+        return index
+
+    def filter(self, records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the records that are kept, unchanged"""
+        counts = self.counts
+        for record in records:
+            counts['read'] += 1
+            obj = normalize_object(record)
+            code = obj['label_code']
+            if not code:
+                counts['missing_label'] += 1
+                continue
+            if self.catalog is not None and code not in self.catalog:
+                counts['unknown_codes'] += 1
+                self.unknown_codes[code] += 1
+                continue
+
+            global_id = obj['global_id']
+            if global_id:
+                label = self._label_index(code)
+                first_label = self.seen.add(global_id, label)
+                if first_label is not None:
+                    if first_label != label:
+                        counts['conflicting_labels'] += 1
+                        if len(self.conflicts) < self.max_samples:
+                            self.conflicts.append({'GlobalId': global_id, 'kept_label': self.codes[first_label],
+                                                   'dropped_label': code})
+                    else:
+                        counts['duplicates'] += 1
+                        if len(self.duplicates) < self.max_samples:
+                            self.duplicates.append(global_id)
+                    continue
+            else:
+                counts['missing_global_id'] += 1
+
+            counts['kept'] += 1
+            yield record
+
+    def summary(self) -> str:
+        counts = self.counts
+        return (f"{counts['kept']} of {counts['read']} objects kept: {counts['duplicates']} duplicates, "
+                f"{counts['conflicting_labels']} conflicting labels, {counts['unknown_codes']} unknown codes, "
+                f"{counts['missing_label']} without label dropped")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'catalog_codes': len(self.catalog) if self.catalog is not None else None,
+            'counts': dict(self.counts),
+            'distinct_objects': len(self.seen),
+            'unknown_codes': dict(self.unknown_codes.most_common()),
+            'conflicting_labels': self.conflicts,
+            'duplicate_global_ids': self.duplicates
+        }
+
+
+def iter_clean_objects(path: str, catalog: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    """Stream the objects of a classification file through an ObjectValidator, printing its summary at the end"""
+    validator = ObjectValidator(catalog)
+    yield from validator.filter(iter_records(path))
+    print(f"Validated objects: {validator.summary()}")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Deduplicate and validate classified objects")
+    parser.add_argument('input_file', help="Classification results (JSON array or NDJSON)")
+    parser.add_argument('--catalog', help="Code catalog (default: label_object_sequenced.json)")
+    parser.add_argument('--output', default=CLEAN_OBJECTS_FILE, help="Clean objects as NDJSON")
+    parser.add_argument('--report', default=REPORT_FILE)
+    args = parser.parse_args()
+
+    for path in (args.input_file, args.catalog):
+        if path and not os.path.exists(path):
+            print(f"Error: Input file '{path}' not found")
+            sys.exit(1)
+
+    catalog = load_catalog_codes(args.catalog)
+    if catalog is None:
+        print("Warning: label_object_sequenced.json not found, codes are not checked")
+
+    validator = ObjectValidator(catalog)
+    try:
+        with span('validate objects'):
+            with open(args.output, 'w', encoding='utf-8') as out:
+                for record in validator.filter(iter_records(args.input_file)):
+                    out.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+                    out.write('\n')
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    progress('objects validated', objects=validator.counts['read'], kept=validator.counts['kept'])
+
+    report = validator.report()
+    report['input_file'] = args.input_file
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(validator.summary())
+    for code, count in list(report['unknown_codes'].items())[:10]:
+        print(f"   • unknown code {code}: {count} objects")
+    print(f"Clean objects saved to: {args.output}")
+    print(f"Report saved to: {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from create_construction_schedule import generate_from_params, load_phase_templates
+from create_schedule_from_objects import build_schedule_tasks, count_objects_by_code
+from duration_estimator import ProductivityTable, aggregate_objects_by_code, estimate_durations, load_productivity_table
+from merge_schedules import merge_schedules
+from normalize_objects import iter_clean_objects
+from schedule_format import day_ordinal, iso_day
+from schedule_instrumentation import progress, span
+
+SUMMARY_FILE = 'portfolio_summary.json'
+CONSTRUCTION_SCHEDULE_FILE = 'construction_schedule.json'
+BIM_SCHEDULE_FILE = 'detailed_schedule_with_child_tasks.json'
+MERGED_SCHEDULE_FILE = 'merged_schedule.json'
+
+# Reference data shared read-only by all projects, set once per worker process
+_reference = {}
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    """
+    Load a portfolio manifest.
+
+    The manifest lists the projects, each with an 'id', its construction
+    parameters ('params' inline or 'params_file') and optionally the
+    'classification_file' of its BIM model. Relative paths are resolved
+    against the manifest's directory.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    projects = manifest.get('projects', [])
+    seen = set()
+    for index, project in enumerate(projects):
+        project.setdefault('id', f"project-{index + 1}")
+        if project['id'] in seen:
+            raise ValueError(f"Duplicate project id '{project['id']}' in manifest")
+        seen.add(project['id'])
+        for key in ('params_file', 'classification_file'):
+            if project.get(key):
+                project[key] = os.path.join(base_dir, project[key])
+    return manifest
+
+
+def _init_worker(label_sequences, productivity_table, phase_templates):
+    _reference['label_sequences'] = label_sequences
+    _reference['table'] = ProductivityTable(productivity_table)
+    _reference['phase_templates'] = phase_templates
+
+
+def _task_resource(task: Dict[str, Any], table: ProductivityTable) -> str:
+    """Return the shared resource a task occupies: its trade, or its phase for construction phase tasks"""
+    if task.get('trade'):
+        return task['trade']
+    if task.get('phase'):
+        return task['phase']
+    return table.resolve(task['object_code'])[1].get('trade') or 'Allgemein'
+
+
+def resource_intervals(tasks: List[Dict[str, Any]], table: ProductivityTable) -> List[List[Any]]:
+    """Return [resource, first day, last day] per task, days as date ordinals"""
+    return [
+        [_task_resource(task, table), day_ordinal(task['start_date']), day_ordinal(task['end_date'])]
+        for task in tasks
+    ]
+
+
+def schedule_project(project: Dict[str, Any], output_dir: str, duration_model: str = 'slots') -> Dict[str, Any]:
+    """
+    Generate the construction and BIM schedules of one project, merge them
+    and write all three to output_dir/<project id>/.
+
+    Runs in a worker process; the reference data comes from _init_worker().
+    Failures are reported in the returned summary instead of raised.
+    """
+    started = time.perf_counter()
+    summary = {'id': project['id'], 'status': 'failed'}
+    log = io.StringIO()
+    try:
+        # The generators report on stdout; keep their output per project
+        with redirect_stdout(log):
+            params = project.get('params')
+            if params is None and project.get('params_file'):
+                with open(project['params_file'], 'r', encoding='utf-8') as f:
+                    params = json.load(f)
+            params = params or {}
+
+            construction_tasks = generate_from_params(params, _reference['phase_templates'])
+            if construction_tasks is None:
+                raise ValueError(log.getvalue().strip() or "Invalid construction parameters")
+
+            bim_tasks, object_count = [], 0
+            if project.get('classification_file'):
+                results = list(iter_clean_objects(project['classification_file'], _reference['label_sequences']))
+                object_count = len(results)
+                durations = None
+                if duration_model == 'productivity':
+                    durations = estimate_durations(aggregate_objects_by_code(results), _reference['table'])
+                start_date = datetime.strptime(params.get('projectStartDate') or '2024-01-01', '%Y-%m-%d')
+                bim_tasks = build_schedule_tasks(_reference['label_sequences'], count_objects_by_code(results),
+                                                 durations, base_date=start_date)
+
+            merged_tasks = merge_schedules(construction_tasks, bim_tasks, params)
+
+        project_dir = os.path.join(output_dir, project['id'])
+        os.makedirs(project_dir, exist_ok=True)
+        with open(os.path.join(project_dir, CONSTRUCTION_SCHEDULE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(construction_tasks, f, indent=2)
+        with open(os.path.join(project_dir, BIM_SCHEDULE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(bim_tasks, f, indent=2, ensure_ascii=False)
+        with open(os.path.join(project_dir, MERGED_SCHEDULE_FILE), 'w', encoding='utf-8') as f:
+            json.dump(merged_tasks, f, indent=2, ensure_ascii=False)
+
+        intervals = resource_intervals(merged_tasks, _reference['table'])
+        summary.update({
+            'status': 'succeeded',
+            'output_dir': project_dir,
+            'construction_tasks': len(construction_tasks),
+            'bim_tasks': len(bim_tasks),
+            'objects': object_count,
+            'start_date': iso_day(min(i[1] for i in intervals)) if intervals else None,
+            'end_date': iso_day(max(i[2] for i in intervals)) if intervals else None,
+            'resource_intervals': intervals
+        })
+    except Exception as e:
+        summary['error'] = str(e)
+    summary['elapsed_s'] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def resource_peaks(project_summaries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Find the day of highest concurrent demand for each shared resource across all projects.
+
+    Demand is the number of tasks occupying the resource on a day. Each
+    resource is swept once over its start and end events.
+    """
+    intervals = {}
+    for summary in project_summaries:
+        for resource, first_day, last_day in summary.get('resource_intervals', []):
+            intervals.setdefault(resource, []).append((summary['id'], first_day, last_day))
+
+    peaks = []
+    for resource, by_project in intervals.items():
+        deltas = {}
+        for _, first_day, last_day in by_project:
+            deltas[first_day] = deltas.get(first_day, 0) + 1
+            deltas[last_day + 1] = deltas.get(last_day + 1, 0) - 1
+
+        active = peak = 0
+        peak_day = None
+        for day in sorted(deltas):
+            active += deltas[day]
+            if active > peak:
+                peak, peak_day = active, day
+        if peak_day is None:
+            continue
+
+        peaks.append({
+            'resource': resource,
+            'peak_tasks': peak,
+            'date': iso_day(peak_day),
+            'projects': sorted({project_id for project_id, first_day, last_day in by_project
+                                if first_day <= peak_day <= last_day})
+        })
+
+    peaks.sort(key=lambda p: (-p['peak_tasks'], p['resource']))
+    return peaks
+
+
+def run_portfolio(manifest: Dict[str, Any], output_dir: str, label_sequences: Dict[str, Dict[str, Any]],
+                  productivity_table: Dict[str, Any], workers: Optional[int] = None,
+                  duration_model: str = 'slots',
+                  phase_templates: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Schedule all projects of a manifest and return the portfolio summary.
+
+    The reference data is loaded by the caller once and handed to each worker
+    process when it starts, not per project; the phase templates are loaded
+    here when not given. With workers=1 the projects run in this process.
+    """
+    if phase_templates is None:
+        phase_templates = load_phase_templates()
+    projects = manifest.get('projects', [])
+    workers = workers or min(len(projects), os.cpu_count() or 1) or 1
+    os.makedirs(output_dir, exist_ok=True)
+
+    summaries = []
+    with span('schedule projects'):
+        if workers == 1:
+            _init_worker(label_sequences, productivity_table, phase_templates)
+            for project in projects:
+                summaries.append(schedule_project(project, output_dir, duration_model))
+                progress('project scheduled', project=project['id'], completed=len(summaries), total=len(projects))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(label_sequences, productivity_table, phase_templates)) as pool:
+                futures = {pool.submit(schedule_project, project, output_dir, duration_model): project
+                           for project in projects}
+                for future in as_completed(futures):
+                    try:
+                        summaries.append(future.result())
+                    except BrokenProcessPool as e:
+                        # A worker died (e.g. out of memory); every project not finished yet fails with it
+                        summaries.append({'id': futures[future]['id'], 'status': 'failed',
+                                          'error': f"Worker process died: {e}"})
+                    progress('project scheduled', project=summaries[-1]['id'],
+                             completed=len(summaries), total=len(projects))
+
+    # Keep the manifest order regardless of completion order
+    order = {project['id']: index for index, project in enumerate(projects)}
+    summaries.sort(key=lambda summary: order[summary['id']])
+
+    with span('resource peaks'):
+        peaks = resource_peaks(summaries)
+
+    succeeded = [s for s in summaries if s['status'] == 'succeeded']
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'workers': workers,
+        'duration_model': duration_model,
+        'totals': {
+            'projects': len(summaries),
+            'succeeded': len(succeeded),
+            'failed': len(summaries) - len(succeeded),
+            'construction_tasks': sum(s['construction_tasks'] for s in succeeded),
+            'bim_tasks': sum(s['bim_tasks'] for s in succeeded),
+            'objects': sum(s['objects'] for s in succeeded),
+            'start_date': min((s['start_date'] for s in succeeded if s['start_date']), default=None),
+            'end_date': max((s['end_date'] for s in succeeded if s['end_date']), default=None)
+        },
+        'resource_peaks': peaks,
+        'projects': [
+            {key: value for key, value in summary.items() if key != 'resource_intervals'}
+            for summary in summaries
+        ]
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Schedule a portfolio of projects from a manifest")
+    parser.add_argument('manifest', help="Portfolio manifest JSON file")
+    parser.add_argument('--output-dir', default='portfolio_output')
+    parser.add_argument('--catalog', default='label_object_sequenced.json')
+    parser.add_argument('--rates', help="Productivity table JSON file (default: productivity_rates.json)")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU, at most one per project)")
+    parser.add_argument('--duration-model', choices=('slots', 'productivity'), default='slots')
+    args = parser.parse_args()
+
+    for path in (args.manifest, args.catalog, args.rates):
+        if path and not os.path.exists(path):
+            print(f"Error: Input file '{path}' not found")
+            sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        manifest = load_manifest(args.manifest)
+        # Reference data is loaded once for the whole portfolio
+        with span('load reference data'):
+            with open(args.catalog, 'r', encoding='utf-8') as f:
+                label_sequences = json.load(f)
+            productivity_table = load_productivity_table(args.rates)
+            phase_templates = load_phase_templates()
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    summary = run_portfolio(manifest, args.output_dir, label_sequences, productivity_table,
+                            workers=args.workers, duration_model=args.duration_model,
+                            phase_templates=phase_templates)
+    summary['elapsed_s'] = round(time.perf_counter() - started, 3)
+
+    summary_path = os.path.join(args.output_dir, SUMMARY_FILE)
+    with open(summary_path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    totals = summary['totals']
+    print(f"Scheduled {totals['succeeded']} of {totals['projects']} projects "
+          f"with {summary['workers']} workers in {summary['elapsed_s']}s")
+    for project in summary['projects']:
+        if project['status'] == 'succeeded':
+            print(f"   • {project['id']}: {project['construction_tasks']} phase tasks, {project['bim_tasks']} BIM tasks, "
+                  f"{project['start_date']} to {project['end_date']}")
+        else:
+            print(f"   • {project['id']}: failed - {project['error']}")
+    print("\nShared resource peaks:")
+    for peak in summary['resource_peaks'][:10]:
+        print(f"   • {peak['resource']}: {peak['peak_tasks']} concurrent tasks on {peak['date']} "
+              f"({len(peak['projects'])} projects)")
+    print(f"\nSummary saved to: {summary_path}")
+
+    if totals['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,524 @@
+import hashlib
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+
+DEFAULT_STORE_PATH = 'project_store.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reference_codes (
+    code TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    sequence INTEGER,
+    parent_code TEXT
+);
+
+CREATE TABLE IF NOT EXISTS objects (
+    object_id INTEGER PRIMARY KEY,
+    global_id TEXT UNIQUE,
+    label_code TEXT NOT NULL,
+    floor TEXT,
+    volume REAL,
+    area REAL,
+    row_hash INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_objects_label_code ON objects (label_code);
+CREATE INDEX IF NOT EXISTS idx_objects_floor ON objects (floor);
+
+CREATE TABLE IF NOT EXISTS code_aggregates (
+    label_code TEXT PRIMARY KEY,
+    object_count INTEGER NOT NULL,
+    volume REAL NOT NULL,
+    area REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS revisions (
+    revision_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT,
+    imported_at TEXT NOT NULL,
+    object_count INTEGER NOT NULL,
+    added INTEGER NOT NULL,
+    removed INTEGER NOT NULL,
+    relabelled INTEGER NOT NULL,
+    modified INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS schedule_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    source TEXT NOT NULL,
+    params TEXT,
+    task_count INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    run_id INTEGER NOT NULL REFERENCES schedule_runs (run_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    task_id TEXT NOT NULL,
+    object_code TEXT,
+    phase TEXT,
+    floor TEXT,
+    sequence INTEGER,
+    start_date TEXT,
+    end_date TEXT,
+    object_count INTEGER,
+    data TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_object_code ON tasks (object_code);
+
+CREATE TABLE IF NOT EXISTS duration_estimates (
+    cache_key TEXT NOT NULL,
+    label_code TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    days REAL NOT NULL,
+    trade TEXT,
+    rate_code TEXT,
+    PRIMARY KEY (cache_key, label_code)
+);
+"""
+
+# Rows per executemany() call when bulk loading
+BATCH_SIZE = 5000
+
+
+def _text_field(text: str, key: str) -> Optional[str]:
+    """Extract a 'key: value;' field from the text representation of a BIM object"""
+    marker = f"{key}: "
+    start = text.find(marker)
+    if start < 0:
+        return None
+    start += len(marker)
+    end = text.find(';', start)
+    return (text[start:end] if end >= 0 else text[start:]).strip() or None
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_object(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize a classified object to the store's fields.
+
+    Accepts the classification results format ('label'), the simple object
+    files ('label_code') and BIM objects with the IFC attributes flattened
+    into a 'text' field.
+    """
+    text = record.get('text') or ''
+    return {
+        'global_id': record.get('GlobalId') or record.get('global_id') or _text_field(text, 'ifc/GlobalId'),
+        'label_code': record.get('label_code') or record.get('label'),
+        'floor': record.get('floor') or record.get('IfcBuildingStorey') or _text_field(text, 'IfcBuildingStorey'),
+        'volume': _number(record.get('volume', record.get('Volume'))),
+        'area': _number(record.get('area', record.get('Area')))
+    }
+
+
+def object_hash(obj: Dict[str, Any]) -> int:
+    """Return a 64-bit hash over the stored attributes of a normalized object"""
+    key = f"{obj['label_code']}|{obj['floor']}|{obj['volume']}|{obj['area']}"
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+def _batches(rows: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class ProjectStore:
+    """Indexed SQLite store for classified objects, reference codes, tasks and schedule runs"""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Bring stores created by earlier versions up to the current schema"""
+        columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(objects)")}
+        with self.conn:
+            if 'row_hash' not in columns:
+                self.conn.execute("ALTER TABLE objects ADD COLUMN row_hash INTEGER")
+            has_aggregates = self.conn.execute("SELECT 1 FROM code_aggregates LIMIT 1").fetchone()
+            has_objects = self.conn.execute("SELECT 1 FROM objects LIMIT 1").fetchone()
+            if has_objects and not has_aggregates:
+                self.rebuild_code_aggregates()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # Loading
+
+    def load_reference_codes(self, label_sequences: Dict[str, Dict[str, Any]]) -> int:
+        """Replace the reference codes with the given label_object_sequenced.json content"""
+        rows = [
+            (code, info['description'], info.get('sequence'),
+             code.rsplit('.', 1)[0] if '.' in code else None)
+            for code, info in label_sequences.items()
+        ]
+        with self.conn:
+            self.conn.execute("DELETE FROM reference_codes")
+            self.conn.executemany(
+                "INSERT INTO reference_codes (code, description, sequence, parent_code) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def load_objects(self, records: Iterable[Dict[str, Any]], replace: bool = False,
+                     batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """
+        Bulk load classified objects in a single transaction.
+
+        Objects are upserted by GlobalId, so loading the same object twice keeps
+        one row with the latest values. Records without a label code or a
+        GlobalId are skipped, since they could not be matched on a later load
+        or revision import; rows without a GlobalId left by older loads are removed.
+
+        Args:
+            records: Iterable of objects in any format accepted by normalize_object()
+            replace: Delete all existing objects first
+            batch_size: Rows per executemany() call
+
+        Returns:
+            Counts of loaded and skipped records
+        """
+        stats = {'loaded': 0, 'skipped': 0}
+
+        def rows():
+            for record in records:
+                obj = normalize_object(record)
+                if not obj['label_code'] or not obj['global_id']:
+                    stats['skipped'] += 1
+                    continue
+                stats['loaded'] += 1
+                yield (obj['global_id'], obj['label_code'], obj['floor'], obj['volume'], obj['area'],
+                       object_hash(obj))
+
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM objects")
+            else:
+                self.conn.execute("DELETE FROM objects WHERE global_id IS NULL")
+            for batch in _batches(rows(), batch_size):
+                self.conn.executemany(
+                    """INSERT INTO objects (global_id, label_code, floor, volume, area, row_hash)
+                       VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (global_id) DO UPDATE SET
+                           label_code = excluded.label_code, floor = excluded.floor,
+                           volume = excluded.volume, area = excluded.area,
+                           row_hash = excluded.row_hash""",
+                    batch
+                )
+            self.rebuild_code_aggregates()
+        return stats
+
+    def rebuild_code_aggregates(self):
+        """Recompute the per-code aggregates from all objects"""
+        self.conn.execute("DELETE FROM code_aggregates")
+        self.conn.execute(
+            """INSERT INTO code_aggregates (label_code, object_count, volume, area)
+               SELECT label_code, COUNT(*), COALESCE(SUM(volume), 0), COALESCE(SUM(area), 0)
+               FROM objects GROUP BY label_code"""
+        )
+
+    # Queries
+
+    def reference_codes(self) -> Dict[str, Dict[str, Any]]:
+        """Return the reference codes in the label_object_sequenced.json format"""
+        cursor = self.conn.execute("SELECT code, description, sequence FROM reference_codes")
+        return {row['code']: {'description': row['description'], 'sequence': row['sequence']}
+                for row in cursor}
+
+    def object_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def code_aggregates(self) -> List[Dict[str, Any]]:
+        """Return object count, total volume and total area per label code"""
+        cursor = self.conn.execute(
+            "SELECT label_code, object_count, volume, area FROM code_aggregates ORDER BY label_code"
+        )
+        return [dict(row) for row in cursor]
+
+    def code_counts(self) -> Dict[str, int]:
+        """Return the number of objects per label code"""
+        cursor = self.conn.execute("SELECT label_code, object_count FROM code_aggregates")
+        return {code: count for code, count in cursor}
+
+    def floor_distribution(self, label_code: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Return object counts per floor for each label code (or a single code)"""
+        query = "SELECT label_code, COALESCE(floor, 'N/A') AS floor, COUNT(*) AS count FROM objects"
+        args = ()
+        if label_code is not None:
+            query += " WHERE label_code = ?"
+            args = (label_code,)
+        query += " GROUP BY label_code, floor ORDER BY label_code, floor"
+
+        distribution = {}
+        for row in self.conn.execute(query, args):
+            distribution.setdefault(row['label_code'], {})[row['floor']] = row['count']
+        return distribution
+
+    def iter_objects(self) -> Iterator[Dict[str, Any]]:
+        """Stream all objects without materializing them in memory"""
+        cursor = self.conn.execute("SELECT global_id, label_code, floor, volume, area FROM objects")
+        for row in cursor:
+            yield dict(row)
+
+    # Revisions
+
+    def object_index(self) -> Dict[str, tuple]:
+        """Return the persisted hash index: GlobalId -> (label_code, row_hash)"""
+        cursor = self.conn.execute(
+            "SELECT global_id, label_code, row_hash FROM objects WHERE global_id IS NOT NULL"
+        )
+        return {global_id: (label_code, row_hash) for global_id, label_code, row_hash in cursor}
+
+    def objects_by_global_id(self, global_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch the stored objects with the given GlobalIds"""
+        found = {}
+        for batch in _batches(global_ids, 500):
+            placeholders = ','.join('?' * len(batch))
+            cursor = self.conn.execute(
+                f"SELECT global_id, label_code, floor, volume, area FROM objects "
+                f"WHERE global_id IN ({placeholders})",
+                batch
+            )
+            for row in cursor:
+                found[row['global_id']] = dict(row)
+        return found
+
+    def apply_object_changes(self, upserts: List[Dict[str, Any]], deletes: List[str],
+                             aggregate_deltas: Dict[str, List[float]]):
+        """
+        Apply an object diff in a single transaction.
+
+        Args:
+            upserts: Normalized objects to insert or update
+            deletes: GlobalIds of removed objects
+            aggregate_deltas: label_code -> [count, volume, area] change
+        """
+        with self.conn:
+            for batch in _batches(((o['global_id'], o['label_code'], o['floor'], o['volume'], o['area'],
+                                    object_hash(o)) for o in upserts), BATCH_SIZE):
+                self.conn.executemany(
+                    """INSERT INTO objects (global_id, label_code, floor, volume, area, row_hash)
+                       VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (global_id) DO UPDATE SET
+                           label_code = excluded.label_code, floor = excluded.floor,
+                           volume = excluded.volume, area = excluded.area,
+                           row_hash = excluded.row_hash""",
+                    batch
+                )
+            for batch in _batches(((global_id,) for global_id in deletes), BATCH_SIZE):
+                self.conn.executemany("DELETE FROM objects WHERE global_id = ?", batch)
+
+            self.conn.executemany(
+                """INSERT INTO code_aggregates (label_code, object_count, volume, area)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT (label_code) DO UPDATE SET
+                       object_count = object_count + excluded.object_count,
+                       volume = volume + excluded.volume,
+                       area = area + excluded.area""",
+                [(code, delta[0], delta[1], delta[2]) for code, delta in aggregate_deltas.items()]
+            )
+            self.conn.execute("DELETE FROM code_aggregates WHERE object_count <= 0")
+
+    def record_revision(self, label: Optional[str], counts: Dict[str, int]) -> int:
+        cursor = self.conn.execute(
+            """INSERT INTO revisions (label, imported_at, object_count, added, removed, relabelled, modified)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (label, datetime.now().isoformat(timespec='seconds'), self.object_count(),
+             counts['added'], counts['removed'], counts['relabelled'], counts['modified'])
+        )
+        self.conn.commit()
+        return cursor.lastrowid
+
+    def run_tasks_for_codes(self, run_id: int, codes: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return the position and task of each task of a run whose object code is in codes"""
+        tasks = []
+        for batch in _batches(codes, 500):
+            placeholders = ','.join('?' * len(batch))
+            cursor = self.conn.execute(
+                f"SELECT position, data FROM tasks WHERE run_id = ? AND object_code IN ({placeholders})",
+                [run_id] + batch
+            )
+            tasks.extend({'position': row['position'], 'task': json.loads(row['data'])} for row in cursor)
+        return tasks
+
+    def update_run_tasks(self, run_id: int, updated: List[Dict[str, Any]], removed: List[int],
+                         added: List[Dict[str, Any]]):
+        """
+        Update, remove and insert tasks of an existing schedule run in place.
+
+        Args:
+            updated: {'position', 'task'} entries to overwrite
+            removed: Positions of tasks to delete
+            added: New tasks, placed among the existing ones by their sequence number
+        """
+        with self.conn:
+            self.conn.executemany(
+                """UPDATE tasks SET sequence = ?, start_date = ?, end_date = ?, object_count = ?, data = ?
+                   WHERE run_id = ? AND position = ?""",
+                [(entry['task'].get('sequence'), entry['task'].get('start_date'), entry['task'].get('end_date'),
+                  entry['task'].get('object_count'), json.dumps(entry['task'], ensure_ascii=False),
+                  run_id, entry['position']) for entry in updated]
+            )
+            self.conn.executemany("DELETE FROM tasks WHERE run_id = ? AND position = ?",
+                                  [(run_id, position) for position in removed])
+            next_position = self.conn.execute(
+                "SELECT COALESCE(MAX(position), -1) + 1 FROM tasks WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            self.conn.executemany(
+                """INSERT INTO tasks (run_id, position, task_id, object_code, phase, floor, sequence,
+                                      start_date, end_date, object_count, data)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(run_id, next_position + i, str(task.get('task_id')), task.get('object_code'),
+                  task.get('phase'), task.get('floor'), task.get('sequence'), task.get('start_date'),
+                  task.get('end_date'), task.get('object_count'), json.dumps(task, ensure_ascii=False))
+                 for i, task in enumerate(added)]
+            )
+            if added:
+                # Renumber the positions in sequence order, through negative
+                # positions so no two tasks share one in between
+                order = [row[0] for row in self.conn.execute(
+                    "SELECT position FROM tasks WHERE run_id = ? ORDER BY sequence IS NULL, sequence, position",
+                    (run_id,)
+                )]
+                self.conn.executemany("UPDATE tasks SET position = ? WHERE run_id = ? AND position = ?",
+                                      [(-1 - new, run_id, old) for new, old in enumerate(order)])
+                self.conn.execute("UPDATE tasks SET position = -1 - position WHERE run_id = ? AND position < 0",
+                                  (run_id,))
+            self.conn.execute(
+                "UPDATE schedule_runs SET task_count = (SELECT COUNT(*) FROM tasks WHERE run_id = ?) "
+                "WHERE run_id = ?",
+                (run_id, run_id)
+            )
+
+    # Schedule runs
+
+    def record_schedule_run(self, tasks: List[Dict[str, Any]], source: str,
+                            params: Optional[Dict[str, Any]] = None) -> int:
+        """Store a generated schedule and its tasks, returning the run id"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO schedule_runs (created_at, source, params, task_count) VALUES (?, ?, ?, ?)",
+                (datetime.now().isoformat(timespec='seconds'), source,
+                 json.dumps(params) if params is not None else None, len(tasks))
+            )
+            run_id = cursor.lastrowid
+            rows = (
+                (run_id, position, str(task.get('task_id', position)), task.get('object_code'),
+                 task.get('phase'), task.get('floor'), task.get('sequence'), task.get('start_date'),
+                 task.get('end_date'), task.get('object_count'), json.dumps(task, ensure_ascii=False))
+                for position, task in enumerate(tasks)
+            )
+            for batch in _batches(rows, BATCH_SIZE):
+                self.conn.executemany(
+                    """INSERT INTO tasks (run_id, position, task_id, object_code, phase, floor, sequence,
+                                          start_date, end_date, object_count, data)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    batch
+                )
+        return run_id
+
+    def latest_run(self, source: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT * FROM schedule_runs WHERE source = ? ORDER BY run_id DESC LIMIT 1", (source,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def run_tasks(self, run_id: int) -> List[Dict[str, Any]]:
+        """Return the tasks of a schedule run in their original order"""
+        cursor = self.conn.execute("SELECT data FROM tasks WHERE run_id = ? ORDER BY position", (run_id,))
+        return [json.loads(row['data']) for row in cursor]
+
+    # Duration estimates
+
+    def duration_estimates(self, cache_key: str) -> Dict[str, Dict[str, Any]]:
+        """Return the cached duration estimates of a model revision and productivity table"""
+        cursor = self.conn.execute(
+            "SELECT label_code, duration, days, trade, rate_code FROM duration_estimates WHERE cache_key = ?",
+            (cache_key,)
+        )
+        return {row['label_code']: {'duration': row['duration'], 'days': row['days'],
+                                    'trade': row['trade'], 'rate_code': row['rate_code']}
+                for row in cursor}
+
+    def save_duration_estimates(self, cache_key: str, estimates: Dict[str, Dict[str, Any]]):
+        """Replace the cached duration estimates; only the latest revision's are kept"""
+        with self.conn:
+            self.conn.execute("DELETE FROM duration_estimates")
+            self.conn.executemany(
+                """INSERT INTO duration_estimates (cache_key, label_code, duration, days, trade, rate_code)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [(cache_key, code, e['duration'], e['days'], e['trade'], e['rate_code'])
+                 for code, e in estimates.items()]
+            )
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the SQLite project store")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH, help="Path to the store database")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_objects = subparsers.add_parser('import-objects', help="Load classified objects from a JSON file")
+    import_objects.add_argument('input_file')
+    import_objects.add_argument('--replace', action='store_true', help="Delete existing objects first")
+
+    import_reference = subparsers.add_parser('import-reference', help="Load the reference code catalog")
+    import_reference.add_argument('input_file', nargs='?', default='label_object_sequenced.json')
+
+    subparsers.add_parser('summary', help="Print object counts per label code")
+    args = parser.parse_args()
+
+    try:
+        with ProjectStore(args.store) as store:
+            if args.command == 'import-objects':
+                # Streamed through the validation stage, against the store's reference codes if it has them
+                from normalize_objects import ObjectValidator, iter_records, load_catalog_codes
+                validator = ObjectValidator(store.reference_codes() or load_catalog_codes())
+                stats = store.load_objects(validator.filter(iter_records(args.input_file)), replace=args.replace)
+                print(f"Loaded {stats['loaded']} objects ({stats['skipped']} without label code or GlobalId skipped)")
+                print(f"Validated objects: {validator.summary()}")
+            elif args.command == 'import-reference':
+                with open(args.input_file, 'r', encoding='utf-8') as f:
+                    count = store.load_reference_codes(json.load(f))
+                print(f"Loaded {count} reference codes")
+            else:
+                aggregates = store.code_aggregates()
+                print(f"Total objects: {store.object_count()}")
+                for row in aggregates:
+                    print(f"   • {row['label_code']}: {row['object_count']} objects, "
+                          f"{row['volume']:.2f} m³, {row['area']:.2f} m²")
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
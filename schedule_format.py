@@ -0,0 +1,368 @@
+import json
+import os
+import struct
+import sys
+from array import array
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Dict, Any, Optional
+
+# Magic bytes and version of the binary schedule format
+MAGIC = b'SCHD'
+VERSION = 1
+# Identifies the columnar JSON document produced by Schedule.to_columnar()
+COLUMNAR_FORMAT = 'schedule-columnar'
+
+# Date format of schedule tasks (Mon 01.01.24)
+DATE_FORMAT = '%a %d.%m.%y'
+
+# Format of the schedules written by the scripts, requested by the API routes
+OUTPUT_FORMAT_ENV = 'SCHEDULE_OUTPUT_FORMAT'
+OUTPUT_FORMATS = ('json', 'binary')
+
+# Storage of each column type. String and JSON values are indices into the
+# shared string table, so repeated codes, descriptions and dates are stored once.
+_TYPECODES = {'int': 'i', 'float': 'd', 'bool': 'B', 'str': 'I', 'json': 'I'}
+_INT_RANGE = (-2 ** 31, 2 ** 31 - 1)
+
+for _typecode in set(_TYPECODES.values()):
+    assert array(_typecode).itemsize in (1, 4, 8), f"Unsupported array item size for '{_typecode}'"
+
+
+def _value_type(value):
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int' if _INT_RANGE[0] <= value <= _INT_RANGE[1] else 'json'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, str):
+        return 'str'
+    return 'json'
+
+
+def _common_type(current, new):
+    if current == new:
+        return current
+    if {current, new} == {'int', 'float'}:
+        return 'float'
+    return 'json'
+
+
+def _padding(offset):
+    return -offset % 8
+
+
+class _Column:
+    __slots__ = ('name', 'type', 'values', 'present')
+
+    def __init__(self, name, column_type, values=None, present=None):
+        self.name = name
+        self.type = column_type
+        self.values = values if values is not None else array(_TYPECODES[column_type])
+        # Presence mask, only kept once a task lacks this key
+        self.present = present
+
+
+class Schedule:
+    """
+    Columnar container for schedule tasks.
+
+    Tasks are stored as one typed array per key instead of one dict per task.
+    Strings (codes, descriptions, floors, dates) are interned in a string table
+    shared by all columns, and values that are neither numbers, booleans nor
+    strings (dependency lists, None) are interned as JSON text.
+
+    Columns holding both integers and floats are stored as floats, so integers
+    in such a column come back as floats.
+    """
+
+    def __init__(self):
+        self._columns: Dict[str, _Column] = {}
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._length = 0
+
+    @classmethod
+    def from_tasks(cls, tasks: Iterable[Dict[str, Any]]) -> 'Schedule':
+        schedule = cls()
+        for task in tasks:
+            schedule.append(task)
+        return schedule
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(self._length):
+            yield self.task(row)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def _intern(self, text):
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(text)
+            self._string_ids[text] = string_id
+        return string_id
+
+    def _encode(self, column_type, value):
+        if column_type == 'str':
+            return self._intern(value)
+        if column_type == 'json':
+            return self._intern(json.dumps(value, ensure_ascii=False))
+        return value
+
+    def _decode(self, column, row):
+        value = column.values[row]
+        if column.type == 'str':
+            return self._strings[value]
+        if column.type == 'json':
+            return json.loads(self._strings[value])
+        if column.type == 'bool':
+            return bool(value)
+        return value
+
+    def _retype(self, column, column_type):
+        """Convert a column to a wider type, e.g. when an int column receives a float"""
+        old_values = [
+            self._decode(column, row) if column.present is None or column.present[row] else None
+            for row in range(self._length)
+        ]
+        column.type = column_type
+        column.values = array(_TYPECODES[column_type])
+        for row, value in enumerate(old_values):
+            present = column.present is None or column.present[row]
+            column.values.append(self._encode(column_type, value) if present else 0)
+
+    def append(self, task: Dict[str, Any]):
+        """Add a task given as a dict"""
+        row = self._length
+        for name, value in task.items():
+            column = self._columns.get(name)
+            value_type = _value_type(value)
+            if column is None:
+                column = _Column(name, value_type)
+                column.values.extend([0] * row)
+                if row:
+                    column.present = array('B', bytes(row))
+                self._columns[name] = column
+            elif column.type != value_type:
+                common_type = _common_type(column.type, value_type)
+                if common_type != column.type:
+                    self._retype(column, common_type)
+            column.values.append(self._encode(column.type, value))
+            if column.present is not None:
+                column.present.append(1)
+
+        # Keys missing from this task
+        for column in self._columns.values():
+            if len(column.values) == row:
+                column.values.append(0)
+                if column.present is None:
+                    column.present = array('B', b'\x01' * row)
+                column.present.append(0)
+        self._length += 1
+
+    def task(self, row: int) -> Dict[str, Any]:
+        """Return the task at the given position as a dict"""
+        if not 0 <= row < self._length:
+            raise IndexError(f"Task {row} out of range")
+        return {
+            column.name: self._decode(column, row)
+            for column in self._columns.values()
+            if column.present is None or column.present[row]
+        }
+
+    def column(self, name: str) -> List[Any]:
+        """Return the values of one key for all tasks (None where a task lacks the key)"""
+        column = self._columns[name]
+        return [
+            self._decode(column, row) if column.present is None or column.present[row] else None
+            for row in range(self._length)
+        ]
+
+    def to_tasks(self) -> List[Dict[str, Any]]:
+        """Return the schedule as the list of task dicts used by the JSON files"""
+        return list(self)
+
+    def to_columnar(self) -> Dict[str, Any]:
+        """Return the schedule as a JSON-serializable columnar document"""
+        columns = {}
+        for column in self._columns.values():
+            entry = {'type': column.type, 'values': column.values.tolist()}
+            if column.present is not None:
+                entry['present'] = column.present.tolist()
+            columns[column.name] = entry
+        return {
+            'format': COLUMNAR_FORMAT,
+            'version': VERSION,
+            'length': self._length,
+            'strings': self._strings,
+            'columns': columns
+        }
+
+    @classmethod
+    def from_columnar(cls, document: Dict[str, Any]) -> 'Schedule':
+        if document.get('format') != COLUMNAR_FORMAT:
+            raise ValueError("Not a columnar schedule document")
+        schedule = cls()
+        schedule._length = document['length']
+        schedule._strings = list(document['strings'])
+        schedule._string_ids = {text: i for i, text in enumerate(schedule._strings)}
+        for name, entry in document['columns'].items():
+            present = array('B', entry['present']) if 'present' in entry else None
+            values = array(_TYPECODES[entry['type']], entry['values'])
+            schedule._columns[name] = _Column(name, entry['type'], values, present)
+        return schedule
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize to the binary format.
+
+        Layout: MAGIC, version (uint8), header length (uint32), UTF-8 JSON header
+        with the string table and column descriptions, then per column its values
+        and, for sparse columns, its presence mask. Sections start at multiples of
+        8 bytes and numbers are little-endian.
+        """
+        header = {
+            'length': self._length,
+            'strings': self._strings,
+            'columns': [
+                {'name': column.name, 'type': column.type, 'sparse': column.present is not None}
+                for column in self._columns.values()
+            ]
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+        out = bytearray(MAGIC)
+        out += struct.pack('<BI', VERSION, len(header_bytes))
+        out += header_bytes
+        for column in self._columns.values():
+            sections = [column.values] + ([column.present] if column.present is not None else [])
+            for section in sections:
+                out += bytes(_padding(len(out)))
+                if sys.byteorder == 'big' and section.itemsize > 1:
+                    section = array(section.typecode, section)
+                    section.byteswap()
+                out += section.tobytes()
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Schedule':
+        if data[:4] != MAGIC:
+            raise ValueError("Not a binary schedule")
+        version, header_length = struct.unpack_from('<BI', data, 4)
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary schedule version {version}")
+        offset = 4 + struct.calcsize('<BI')
+        header = json.loads(data[offset:offset + header_length].decode('utf-8'))
+        offset += header_length
+
+        schedule = cls()
+        schedule._length = length = header['length']
+        schedule._strings = header['strings']
+        schedule._string_ids = {text: i for i, text in enumerate(schedule._strings)}
+
+        def read_section(typecode):
+            nonlocal offset
+            offset += _padding(offset)
+            section = array(typecode)
+            size = length * section.itemsize
+            section.frombytes(data[offset:offset + size])
+            if sys.byteorder == 'big' and section.itemsize > 1:
+                section.byteswap()
+            offset += size
+            return section
+
+        for entry in header['columns']:
+            values = read_section(_TYPECODES[entry['type']])
+            present = read_section('B') if entry['sparse'] else None
+            schedule._columns[entry['name']] = _Column(entry['name'], entry['type'], values, present)
+        return schedule
+
+
+def output_format() -> str:
+    """Return the schedule format requested through SCHEDULE_OUTPUT_FORMAT ('json' by default)"""
+    requested = os.environ.get(OUTPUT_FORMAT_ENV, 'json').lower()
+    return requested if requested in OUTPUT_FORMATS else 'json'
+
+
+@lru_cache(maxsize=None)
+def day_ordinal(text: Optional[str]) -> Optional[int]:
+    """Parse a schedule date (Mon 01.01.24) or an ISO date (2024-01-01) into a date ordinal, None if invalid"""
+    if not text:
+        return None
+    try:
+        if text[4:5] == '-':
+            return datetime.strptime(text[:10], '%Y-%m-%d').toordinal()
+        # The weekday abbreviation is ignored
+        return datetime.strptime(text.split(' ', 1)[-1], '%d.%m.%y').toordinal()
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def format_day(ordinal: int) -> str:
+    """Format a date ordinal as a schedule date"""
+    return date.fromordinal(ordinal).strftime(DATE_FORMAT)
+
+
+@lru_cache(maxsize=None)
+def iso_day(ordinal: int) -> str:
+    """Format a date ordinal as an ISO date"""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def load_schedule(path: str) -> List[Dict[str, Any]]:
+    """Load schedule tasks from a JSON, columnar JSON or binary schedule file"""
+    with open(path, 'rb') as f:
+        return parse_schedule(f.read())
+
+
+def parse_schedule(data: bytes) -> List[Dict[str, Any]]:
+    """Parse schedule tasks from JSON, columnar JSON or binary schedule data"""
+    if data[:4] == MAGIC:
+        return Schedule.from_bytes(data).to_tasks()
+    document = json.loads(data.decode('utf-8'))
+    if isinstance(document, dict) and document.get('format') == COLUMNAR_FORMAT:
+        return Schedule.from_columnar(document).to_tasks()
+    return document
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert schedules between JSON, columnar JSON and binary")
+    parser.add_argument('input_file', help="Schedule file (JSON task list, columnar JSON or binary)")
+    parser.add_argument('output_file')
+    parser.add_argument('--to', choices=('json', 'columnar', 'binary'), default='binary')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input_file):
+        print(f"Error: Input file '{args.input_file}' not found")
+        sys.exit(1)
+
+    tasks = load_schedule(args.input_file)
+    if args.to == 'json':
+        with open(args.output_file, 'w', encoding='utf-8') as f:
+            json.dump(tasks, f, indent=2, ensure_ascii=False)
+    else:
+        schedule = Schedule.from_tasks(tasks)
+        if args.to == 'binary':
+            with open(args.output_file, 'wb') as f:
+                f.write(schedule.to_bytes())
+        else:
+            with open(args.output_file, 'w', encoding='utf-8') as f:
+                json.dump(schedule.to_columnar(), f, ensure_ascii=False, separators=(',', ':'))
+
+    input_size = os.path.getsize(args.input_file)
+    output_size = os.path.getsize(args.output_file)
+    print(f"Converted {len(tasks)} tasks: {input_size} -> {output_size} bytes ({args.to})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import atexit
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Instrumentation is switched on with SCHEDULE_INSTRUMENTATION=1. When it is off,
+# span() hands out a shared no-op context manager and nothing is recorded.
+ENABLED = os.environ.get('SCHEDULE_INSTRUMENTATION', '').lower() not in ('', '0', 'false', 'no')
+
+# Progress events are written as they happen when SCHEDULE_PROGRESS=1
+PROGRESS_ENABLED = os.environ.get('SCHEDULE_PROGRESS', '').lower() not in ('', '0', 'false', 'no')
+
+# Prefixes of the stderr lines carrying spans and progress events, parsed by the API routes
+TRAILER_PREFIX = 'SCHEDULE_SPANS '
+PROGRESS_PREFIX = 'SCHEDULE_PROGRESS '
+
+_spans = []
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB, or None if unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    if sys.platform == 'darwin':
+        return round(peak / (1024 * 1024), 2)
+    return round(peak / 1024, 2)
+
+
+class _Span:
+    __slots__ = ('name', 'wall_start', 'cpu_start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _spans.append({
+            'name': self.name,
+            'wall_ms': round((time.perf_counter() - self.wall_start) * 1000, 2),
+            'cpu_ms': round((time.process_time() - self.cpu_start) * 1000, 2),
+            'peak_rss_mb': peak_rss_mb(),
+            'failed': exc_type is not None
+        })
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name):
+    """Record wall time, CPU time and peak RSS of a named stage (with span('build tasks'): ...)"""
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(name)
+
+
+def _script_name():
+    return os.path.basename(sys.argv[0]) if sys.argv and sys.argv[0] else None
+
+
+def progress(event, **details):
+    """Report a progress event (e.g. progress('tasks built', tasks=120)) on stderr"""
+    if not PROGRESS_ENABLED:
+        return
+    payload = {'event': event, 'script': _script_name(), 'timestamp': time.time()}
+    payload.update(details)
+    sys.stderr.write(PROGRESS_PREFIX + json.dumps(payload) + '\n')
+    sys.stderr.flush()
+
+
+def emit_spans(stream=None):
+    """Write the recorded spans as a single machine-readable trailer line to stderr"""
+    if not ENABLED:
+        return
+    trailer = {
+        'script': _script_name(),
+        'spans': _spans
+    }
+    stream = stream or sys.stderr
+    stream.write(TRAILER_PREFIX + json.dumps(trailer) + '\n')
+    stream.flush()
+
+
+def _record_interpreter_startup():
+    """
+    Record interpreter startup as a span when the caller passed its spawn time.
+
+    The API routes set SCHEDULE_SPAWNED_AT_MS (milliseconds since the epoch) when
+    spawning a script, so the time until this module is imported covers process
+    creation, interpreter startup and the script's own imports.
+    """
+    spawned_at = os.environ.get('SCHEDULE_SPAWNED_AT_MS')
+    if not spawned_at:
+        return
+    try:
+        startup_ms = time.time() * 1000 - float(spawned_at)
+    except ValueError:
+        return
+    _spans.append({
+        'name': 'interpreter startup',
+        'wall_ms': round(startup_ms, 2),
+        'cpu_ms': round(time.process_time() * 1000, 2),
+        'peak_rss_mb': peak_rss_mb(),
+        'failed': False
+    })
+
+
+if ENABLED:
+    _record_interpreter_startup()
+    atexit.register(emit_spans)
@@ -1,4 +1,4 @@
-import React, { useEffect, useRef } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { gantt } from 'dhtmlx-gantt';
 import 'dhtmlx-gantt/codebase/dhtmlxgantt.css';
 import { Task } from '../types/schedule';
@@ -7,8 +7,29 @@ interface DHtmlxGanttChartProps {
   tasks: Task[];
 }
 
+// 'tasks' renders every task client-side; the others load server-side roll-ups branch by branch
+type GanttView = 'tasks' | 'phase' | 'code' | 'sequence' | 'time';
+
+const GANTT_VIEWS: { view: GanttView; label: string }[] = [
+  { view: 'tasks', label: 'All Tasks' },
+  { view: 'phase', label: 'By Phase' },
+  { view: 'code', label: 'By Code' },
+  { view: 'sequence', label: 'By Sequence' },
+  { view: 'time', label: 'By Month' }
+];
+
+// Schedules larger than this open in the phase roll-up instead of rendering every task
+const ROLLUP_THRESHOLD = 500;
+
 const DHtmlxGanttChart: React.FC<DHtmlxGanttChartProps> = ({ tasks }) => {
   const ganttContainer = useRef<HTMLDivElement>(null);
+  // Roll-up of the tasks being shown, built on the server once per task list
+  const rollup = useRef<{ tasks: Task[]; id: Promise<string> } | null>(null);
+  const [view, setView] = useState<GanttView>(tasks.length > ROLLUP_THRESHOLD ? 'phase' : 'tasks');
+
+  useEffect(() => {
+    setView(tasks.length > ROLLUP_THRESHOLD ? 'phase' : 'tasks');
+  }, [tasks]);
 
   useEffect(() => {
     if (!ganttContainer.current) return;
@@ -119,16 +140,55 @@ const DHtmlxGanttChart: React.FC<DHtmlxGanttChartProps> = ({ tasks }) => {
     gantt.init(ganttContainer.current);
 
     // Transform and load data
-    const transformedData = transformTasksForDHtmlx(tasks);
-    gantt.parse(transformedData);
+    gantt.clearAll();
+    gantt.config.branch_loading = view !== 'tasks';
+    let cancelled = false;
+    if (view === 'tasks') {
+      const transformedData = transformTasksForDHtmlx(tasks);
+      gantt.parse(transformedData);
+    } else {
+      requestRollup(tasks)
+        .then(rollupId => {
+          // Top-level rows only; children are requested with parent_id when a row is expanded
+          if (!cancelled) gantt.load(`/api/gantt-rollup?rollup=${rollupId}&view=${view}`);
+        })
+        .catch(error => {
+          console.error('Failed to load the Gantt roll-up, showing all tasks:', error);
+          if (!cancelled) setView('tasks');
+        });
+    }
 
     // Cleanup function
     return () => {
+      cancelled = true;
       if (gantt) {
         gantt.clearAll();
       }
     };
-  }, [tasks]);
+  }, [tasks, view]);
+
+  // Posts the tasks to the roll-up endpoint, once per task list, and resolves with the roll-up id
+  const requestRollup = (tasks: Task[]): Promise<string> => {
+    if (!rollup.current || rollup.current.tasks !== tasks) {
+      const id: Promise<string> = fetch('/api/gantt-rollup', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ tasks })
+      })
+        .then(response => response.json())
+        .then(result => {
+          if (!result.success) throw new Error(result.error || result.message);
+          return result.rollupId as string;
+        })
+        .catch(error => {
+          // Let the next view switch try again
+          if (rollup.current?.id === id) rollup.current = null;
+          throw error;
+        });
+      rollup.current = { tasks, id };
+    }
+    return rollup.current.id;
+  };
 
   const transformTasksForDHtmlx = (tasks: Task[]) => {
     const data = {
@@ -180,6 +240,18 @@ const DHtmlxGanttChart: React.FC<DHtmlxGanttChartProps> = ({ tasks }) => {
         alignItems: 'center'
       }}>
         <h3 style={{ margin: 0, color: '#333' }}>Construction Schedule - Interactive Gantt Chart</h3>
+        <div>
+          {GANTT_VIEWS.map(option => (
+            <button
+              key={option.view}
+              onClick={() => setView(option.view)}
+              disabled={view === option.view}
+              style={{ marginRight: '5px', padding: '5px 10px', cursor: 'pointer' }}
+            >
+              {option.label}
+            </button>
+          ))}
+        </div>
         <div>
           <button 
             onClick={() => gantt.ext.zoom.setLevel("day")}
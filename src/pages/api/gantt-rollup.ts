@@ -0,0 +1,147 @@
+import type { NextApiRequest, NextApiResponse } from 'next';
+import { createHash, randomUUID } from 'crypto';
+import path from 'path';
+import fs from 'fs';
+import { buildGanttRollups } from '../../utils/schedulePipeline';
+
+// Roll-ups are built per task list and named after a hash of its tasks
+const ROLLUP_DIR = path.join(process.cwd(), 'gantt_rollups');
+const ROLLUP_ID = /^[0-9a-f]{32}$/;
+// Roll-up files kept on disk; the least recently built are removed first
+const MAX_ROLLUP_FILES = 50;
+// Parsed roll-ups kept in memory for the branch requests of open charts
+const MAX_CACHED_ROLLUPS = 8;
+const VIEWS = ['phase', 'code', 'sequence', 'time'];
+
+// The chart posts its whole task list
+export const config = {
+  api: {
+    bodyParser: { sizeLimit: '50mb' },
+  },
+};
+
+const cached = new Map<string, any>();
+
+function rollupPath(rollupId: string): string {
+  return path.join(ROLLUP_DIR, `${rollupId}.json`);
+}
+
+function loadRollups(rollupId: string): any | null {
+  if (cached.has(rollupId)) return cached.get(rollupId);
+  const file = rollupPath(rollupId);
+  if (!fs.existsSync(file)) return null;
+  const rollups = JSON.parse(fs.readFileSync(file, 'utf8'));
+  cached.set(rollupId, rollups);
+  if (cached.size > MAX_CACHED_ROLLUPS) {
+    cached.delete(cached.keys().next().value as string);
+  }
+  return rollups;
+}
+
+function pruneRollupFiles() {
+  const files = fs.readdirSync(ROLLUP_DIR)
+    .filter(name => name.endsWith('.json'))
+    .map(name => ({ name, mtimeMs: fs.statSync(path.join(ROLLUP_DIR, name)).mtimeMs }))
+    .sort((a, b) => b.mtimeMs - a.mtimeMs);
+  files.slice(MAX_ROLLUP_FILES).forEach(({ name }) => {
+    fs.unlinkSync(path.join(ROLLUP_DIR, name));
+    cached.delete(name.replace(/\.json$/, ''));
+  });
+}
+
+/**
+ * Build the roll-ups of the posted tasks unless they exist already, and
+ * return their id for the view requests.
+ */
+async function createRollups(req: NextApiRequest, res: NextApiResponse) {
+  const tasks = req.body?.tasks;
+  if (!Array.isArray(tasks)) {
+    return res.status(400).json({ success: false, message: 'Expected a JSON body with a tasks array' });
+  }
+
+  const rollupId = createHash('sha256').update(JSON.stringify(tasks)).digest('hex').slice(0, 32);
+  try {
+    if (!fs.existsSync(rollupPath(rollupId))) {
+      fs.mkdirSync(ROLLUP_DIR, { recursive: true });
+      // Written under a temporary name so concurrent requests never read a partial file
+      const tempPath = path.join(ROLLUP_DIR, `${rollupId}.${randomUUID()}.tmp`);
+      await buildGanttRollups(tasks, tempPath, { instrumentation: [] });
+      fs.renameSync(tempPath, rollupPath(rollupId));
+      pruneRollupFiles();
+    }
+  } catch (error) {
+    console.error('Error building Gantt rollups:', error);
+    return res.status(500).json({
+      success: false,
+      message: 'Failed to build Gantt rollups',
+      error: error instanceof Error ? error.message : 'Unknown error'
+    });
+  }
+
+  return res.status(200).json({ success: true, rollupId, taskCount: tasks.length });
+}
+
+function groupRow(node: any) {
+  return {
+    id: node.id,
+    text: `${node.text} (${node.task_count})`,
+    start_date: node.start_date,
+    duration: node.duration,
+    parent: node.parent || 0,
+    type: 'project',
+    progress: 0,
+    open: false,
+    // Tells the DHtmlx chart to request the children when the row is expanded
+    $has_child: true,
+    task_count: node.task_count,
+    object_count: node.object_count
+  };
+}
+
+/**
+ * POST { tasks } builds the roll-ups of a task list and returns their id.
+ * GET returns the rows of one aggregated view of those roll-ups in the DHtmlx
+ * data format: without parent_id the top-level rows, otherwise the direct
+ * children of that row, so the chart loads branches lazily.
+ */
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method === 'POST') {
+    return createRollups(req, res);
+  }
+  if (req.method !== 'GET') {
+    return res.status(405).json({ success: false, message: 'Method not allowed' });
+  }
+
+  const rollupId = String(req.query.rollup || '');
+  if (!ROLLUP_ID.test(rollupId)) {
+    return res.status(400).json({ success: false, message: 'Missing or invalid rollup id' });
+  }
+  const view = String(req.query.view || 'phase');
+  if (!VIEWS.includes(view)) {
+    return res.status(400).json({ success: false, message: `Unknown view '${view}', expected one of ${VIEWS.join(', ')}` });
+  }
+
+  let rollups: any;
+  try {
+    rollups = loadRollups(rollupId);
+  } catch (error) {
+    console.error('Error reading Gantt rollups:', error);
+    return res.status(500).json({ success: false, message: 'Failed to read Gantt rollups' });
+  }
+  if (!rollups) {
+    return res.status(404).json({ success: false, message: `Rollup '${rollupId}' not found, post the tasks again` });
+  }
+
+  const { roots, nodes } = rollups.views[view];
+  const parentId = req.query.parent_id !== undefined ? String(req.query.parent_id) : null;
+  if (parentId !== null && !nodes[parentId]) {
+    return res.status(404).json({ success: false, message: `Row '${parentId}' not found in view '${view}'` });
+  }
+
+  const ids: string[] = parentId === null ? roots : nodes[parentId].children;
+  const data = ids.map(id =>
+    nodes[id] ? groupRow(nodes[id]) : { ...rollups.tasks[id], parent: parentId || 0, progress: 0 }
+  );
+
+  return res.status(200).json({ data, links: [] });
+}
@@ -0,0 +1,45 @@
+import type { NextApiRequest, NextApiResponse } from 'next';
+import { JobEvent, getScheduleJob, isJobFinished, subscribeToJob } from '../../../../utils/scheduleJobs';
+
+/**
+ * Server-sent events for a schedule job. Past events are replayed first, then
+ * new ones are streamed until the job succeeds or fails.
+ */
+export default function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== 'GET') {
+    return res.status(405).json({ success: false, message: 'Method not allowed' });
+  }
+
+  const job = getScheduleJob(String(req.query.jobId));
+  if (!job) {
+    return res.status(404).json({ success: false, message: 'Job not found or expired' });
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache, no-transform',
+    Connection: 'keep-alive'
+  });
+
+  const send = (event: JobEvent) => {
+    res.write(`id: ${event.id}\nevent: ${event.event}\ndata: ${JSON.stringify(event)}\n\n`);
+  };
+
+  // EventSource reconnects with the id of the last event it received
+  const lastEventId = parseInt(String(req.headers['last-event-id'] ?? '-1'), 10);
+  job.events.filter(event => event.id > lastEventId).forEach(send);
+
+  if (isJobFinished(job)) {
+    res.end();
+    return;
+  }
+
+  const unsubscribe = subscribeToJob(job.id, (event, current) => {
+    send(event);
+    if (isJobFinished(current)) {
+      unsubscribe();
+      res.end();
+    }
+  });
+  req.on('close', unsubscribe);
+}
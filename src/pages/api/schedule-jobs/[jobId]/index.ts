@@ -0,0 +1,35 @@
+import type { NextApiRequest, NextApiResponse } from 'next';
+import { isInstrumentationEnabled } from '../../../../utils/pythonInstrumentation';
+import { encodeColumnarSchedule } from '../../../../utils/scheduleFormat';
+import { getScheduleJob, isJobFinished } from '../../../../utils/scheduleJobs';
+
+export default function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== 'GET') {
+    return res.status(405).json({ success: false, message: 'Method not allowed' });
+  }
+
+  const job = getScheduleJob(String(req.query.jobId));
+  if (!job) {
+    return res.status(404).json({ success: false, message: 'Job not found or expired' });
+  }
+
+  // Pollers pass the id of the last event they saw to receive only newer ones
+  const after = req.query.after !== undefined ? parseInt(String(req.query.after), 10) : -1;
+  const events = job.events.filter(event => event.id > after);
+
+  return res.status(200).json({
+    success: job.status !== 'failed',
+    jobId: job.id,
+    status: job.status,
+    createdAt: job.createdAt,
+    startedAt: job.startedAt,
+    finishedAt: job.finishedAt,
+    expiresAt: job.expiresAt,
+    events,
+    ...(isJobFinished(job) && job.result && {
+      schedule: req.query.format === 'columnar' ? encodeColumnarSchedule(job.result) : job.result
+    }),
+    ...(job.error && { error: job.error }),
+    ...(isInstrumentationEnabled() && { instrumentation: job.instrumentation })
+  });
+}
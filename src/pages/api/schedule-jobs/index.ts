@@ -0,0 +1,40 @@
+import type { NextApiRequest, NextApiResponse } from 'next';
+import { JobQueueFullError, JobStatus, submitScheduleJob } from '../../../utils/scheduleJobs';
+
+type SubmitResponse = {
+  success: boolean;
+  message: string;
+  jobId?: string;
+  status?: JobStatus;
+  error?: string;
+};
+
+export default function handler(
+  req: NextApiRequest,
+  res: NextApiResponse<SubmitResponse>
+) {
+  if (req.method !== 'POST') {
+    return res.status(405).json({ success: false, message: 'Method not allowed' });
+  }
+
+  try {
+    const job = submitScheduleJob(req.body);
+    return res.status(202).json({
+      success: true,
+      message: 'Schedule generation queued',
+      jobId: job.id,
+      status: job.status
+    });
+  } catch (error) {
+    if (error instanceof JobQueueFullError) {
+      res.setHeader('Retry-After', '30');
+      return res.status(503).json({ success: false, message: 'Too many queued jobs', error: error.message });
+    }
+    console.error('Error submitting schedule job:', error);
+    return res.status(500).json({
+      success: false,
+      message: 'Failed to queue schedule generation',
+      error: error instanceof Error ? error.message : 'Unknown error'
+    });
+  }
+}
@@ -29,6 +29,11 @@ export interface Excavation extends ConstructionPhase {
   dailyRate: number;
 }
 
+export interface Substructure extends ConstructionPhase {
+  type: string;
+  overlapWithPrevious: number;
+}
+
 export interface Structure extends ConstructionPhase {
   concreteCoreIncluded: boolean;
   coreConstructionType: string;
@@ -49,16 +54,30 @@ export interface Fitout extends ConstructionPhase {
   baseDuration: number;
 }
 
+// Per-building settings; the phase sections override the project's for this building
+export interface Building {
+  id?: string;
+  name?: string;
+  startOffset?: number;
+  substructure?: Partial<Substructure>;
+  structure?: Partial<Structure>;
+  superstructure?: Partial<Superstructure>;
+  facade?: Partial<Facade>;
+  fitout?: Partial<Fitout>;
+}
+
 export interface ScheduleState {
   projectStartDate: string;
   buildingType: string;
   siteEstablishment: SiteEstablishment;
   demolition: Demolition;
   excavation: Excavation;
+  substructure: Substructure;
   structure: Structure;
   superstructure: Superstructure;
   facade: Facade;
   fitout: Fitout;
+  buildings?: Building[];
 }
 
 export interface Task {
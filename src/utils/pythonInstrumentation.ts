@@ -0,0 +1,112 @@
+// Prefixes of the stderr lines written by schedule_instrumentation.py
+const TRAILER_PREFIX = 'SCHEDULE_SPANS ';
+const PROGRESS_PREFIX = 'SCHEDULE_PROGRESS ';
+
+export interface InstrumentationSpan {
+  name: string;
+  wall_ms: number;
+  cpu_ms: number;
+  peak_rss_mb: number | null;
+  failed: boolean;
+}
+
+export interface ScriptInstrumentation {
+  script: string | null;
+  process_wall_ms: number;
+  spans: InstrumentationSpan[];
+}
+
+export interface ProgressEvent {
+  event: string;
+  script: string | null;
+  timestamp: number;
+  [key: string]: any;
+}
+
+export function isInstrumentationEnabled(): boolean {
+  const flag = (process.env.SCHEDULE_INSTRUMENTATION || '').toLowerCase();
+  return flag !== '' && flag !== '0' && flag !== 'false' && flag !== 'no';
+}
+
+/**
+ * Environment for a spawned Python script. The spawn time lets the script
+ * report interpreter startup as its own span.
+ */
+export function instrumentedEnv(): NodeJS.ProcessEnv {
+  return {
+    ...process.env,
+    SCHEDULE_SPAWNED_AT_MS: String(Date.now())
+  };
+}
+
+/**
+ * Split the instrumentation trailer off a script's stderr.
+ * Returns the remaining stderr and the parsed spans (null when no trailer was written).
+ */
+export function extractInstrumentation(
+  stderr: string,
+  processWallMs: number
+): { stderr: string; instrumentation: ScriptInstrumentation | null } {
+  let instrumentation: ScriptInstrumentation | null = null;
+  const remaining: string[] = [];
+
+  for (const line of stderr.split('\n')) {
+    if (line.startsWith(TRAILER_PREFIX)) {
+      try {
+        const trailer = JSON.parse(line.slice(TRAILER_PREFIX.length));
+        instrumentation = {
+          script: trailer.script ?? null,
+          process_wall_ms: processWallMs,
+          spans: trailer.spans || []
+        };
+      } catch (error) {
+        console.warn('Failed to parse instrumentation trailer:', error);
+      }
+    } else {
+      remaining.push(line);
+    }
+  }
+
+  return { stderr: remaining.join('\n').trim(), instrumentation };
+}
+
+/**
+ * Line-buffered reader for a script's stderr. Progress lines are dispatched to
+ * onProgress as soon as they are complete; everything else is kept for text().
+ */
+export function createStderrReader(onProgress?: (event: ProgressEvent) => void) {
+  let buffer = '';
+  let collected = '';
+
+  const handleLine = (line: string) => {
+    if (line.startsWith(PROGRESS_PREFIX)) {
+      if (!onProgress) return;
+      try {
+        onProgress(JSON.parse(line.slice(PROGRESS_PREFIX.length)));
+      } catch (error) {
+        console.warn('Failed to parse progress event:', error);
+      }
+      return;
+    }
+    collected += line + '\n';
+  };
+
+  return {
+    push(chunk: string) {
+      buffer += chunk;
+      let newline = buffer.indexOf('\n');
+      while (newline >= 0) {
+        handleLine(buffer.slice(0, newline));
+        buffer = buffer.slice(newline + 1);
+        newline = buffer.indexOf('\n');
+      }
+    },
+    text(): string {
+      if (buffer) {
+        handleLine(buffer);
+        buffer = '';
+      }
+      return collected;
+    }
+  };
+}
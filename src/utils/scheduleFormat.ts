@@ -0,0 +1,181 @@
+// Readers and writers for the compact schedule formats of schedule_format.py
+
+const MAGIC = 'SCHD';
+const VERSION = 1;
+export const COLUMNAR_FORMAT = 'schedule-columnar';
+
+type ColumnType = 'int' | 'float' | 'bool' | 'str' | 'json';
+
+const ITEM_SIZES: { [type in ColumnType]: number } = { int: 4, float: 8, bool: 1, str: 4, json: 4 };
+
+export interface ColumnarSchedule {
+  format: typeof COLUMNAR_FORMAT;
+  version: number;
+  length: number;
+  strings: string[];
+  columns: {
+    [name: string]: { type: ColumnType; values: number[]; present?: number[] };
+  };
+}
+
+export function isBinarySchedule(data: Buffer): boolean {
+  return data.length >= 4 && data.toString('latin1', 0, 4) === MAGIC;
+}
+
+function decodeValue(type: ColumnType, value: number, strings: string[]): any {
+  switch (type) {
+    case 'str':
+      return strings[value];
+    case 'json':
+      return JSON.parse(strings[value]);
+    case 'bool':
+      return value !== 0;
+    default:
+      return value;
+  }
+}
+
+function buildTasks(
+  length: number,
+  strings: string[],
+  columns: { name: string; type: ColumnType; read: (row: number) => number; present?: (row: number) => boolean }[]
+): any[] {
+  const tasks: any[] = new Array(length);
+  for (let row = 0; row < length; row++) {
+    const task: any = {};
+    for (const column of columns) {
+      if (column.present && !column.present(row)) continue;
+      task[column.name] = decodeValue(column.type, column.read(row), strings);
+    }
+    tasks[row] = task;
+  }
+  return tasks;
+}
+
+/**
+ * Decode a binary schedule written by Schedule.to_bytes() into task objects.
+ * Sections start at multiples of 8 bytes, numbers are little-endian.
+ */
+export function decodeBinarySchedule(data: Buffer): any[] {
+  if (!isBinarySchedule(data)) {
+    throw new Error('Not a binary schedule');
+  }
+  const view = new DataView(data.buffer, data.byteOffset, data.byteLength);
+  const version = view.getUint8(4);
+  if (version !== VERSION) {
+    throw new Error(`Unsupported binary schedule version ${version}`);
+  }
+  const headerLength = view.getUint32(5, true);
+  let offset = 9;
+  const header = JSON.parse(data.toString('utf8', offset, offset + headerLength));
+  offset += headerLength;
+
+  const length: number = header.length;
+  const align = () => {
+    offset += (8 - (offset % 8)) % 8;
+  };
+
+  const columns = header.columns.map((entry: { name: string; type: ColumnType; sparse: boolean }) => {
+    align();
+    const valuesOffset = offset;
+    offset += length * ITEM_SIZES[entry.type];
+
+    let read: (row: number) => number;
+    switch (entry.type) {
+      case 'int':
+        read = row => view.getInt32(valuesOffset + row * 4, true);
+        break;
+      case 'float':
+        read = row => view.getFloat64(valuesOffset + row * 8, true);
+        break;
+      case 'bool':
+        read = row => view.getUint8(valuesOffset + row);
+        break;
+      default:
+        read = row => view.getUint32(valuesOffset + row * 4, true);
+    }
+
+    let present: ((row: number) => boolean) | undefined;
+    if (entry.sparse) {
+      align();
+      const presentOffset = offset;
+      offset += length;
+      present = row => view.getUint8(presentOffset + row) !== 0;
+    }
+    return { name: entry.name, type: entry.type, read, present };
+  });
+
+  return buildTasks(length, header.strings, columns);
+}
+
+function valueType(value: any): ColumnType {
+  if (typeof value === 'boolean') return 'bool';
+  if (typeof value === 'number') {
+    return Number.isInteger(value) && value >= -2147483648 && value <= 2147483647 ? 'int' : 'float';
+  }
+  if (typeof value === 'string') return 'str';
+  return 'json';
+}
+
+/**
+ * Encode task objects as a columnar document, e.g. for API responses requested
+ * with ?format=columnar. Keys are columns and strings are interned once.
+ */
+export function encodeColumnarSchedule(tasks: any[]): ColumnarSchedule {
+  const strings: string[] = [];
+  const stringIds = new Map<string, number>();
+  const intern = (text: string) => {
+    let id = stringIds.get(text);
+    if (id === undefined) {
+      id = strings.length;
+      strings.push(text);
+      stringIds.set(text, id);
+    }
+    return id;
+  };
+
+  // Column types are decided over all tasks first so no column needs converting
+  const types: { [name: string]: ColumnType } = {};
+  const counts: { [name: string]: number } = {};
+  for (const task of tasks) {
+    for (const name of Object.keys(task)) {
+      if (task[name] === undefined) continue;
+      const type = valueType(task[name]);
+      const current = types[name];
+      if (current === undefined || current === type) {
+        types[name] = type;
+      } else if ((current === 'int' && type === 'float') || (current === 'float' && type === 'int')) {
+        types[name] = 'float';
+      } else {
+        types[name] = 'json';
+      }
+      counts[name] = (counts[name] || 0) + 1;
+    }
+  }
+
+  const columns: ColumnarSchedule['columns'] = {};
+  for (const name of Object.keys(types)) {
+    const type = types[name];
+    const values: number[] = new Array(tasks.length);
+    const present: number[] | undefined = counts[name] < tasks.length ? new Array(tasks.length) : undefined;
+    tasks.forEach((task, row) => {
+      const value = task[name];
+      const isPresent = value !== undefined;
+      if (present) present[row] = isPresent ? 1 : 0;
+      if (!isPresent) {
+        values[row] = 0;
+      } else if (type === 'str') {
+        values[row] = intern(value);
+      } else if (type === 'json') {
+        values[row] = intern(JSON.stringify(value));
+      } else if (type === 'bool') {
+        values[row] = value ? 1 : 0;
+      } else {
+        values[row] = value;
+      }
+    });
+    columns[name] = present ? { type, values, present } : { type, values };
+  }
+
+  return { format: COLUMNAR_FORMAT, version: VERSION, length: tasks.length, strings, columns };
+}
@@ -0,0 +1,180 @@
+import { randomUUID } from 'crypto';
+import { ScriptInstrumentation } from './pythonInstrumentation';
+import { runSchedulePipeline } from './schedulePipeline';
+
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface JobEvent {
+  id: number;
+  event: string;
+  timestamp: number;
+  [key: string]: any;
+}
+
+export interface ScheduleJob {
+  id: string;
+  status: JobStatus;
+  createdAt: number;
+  startedAt?: number;
+  finishedAt?: number;
+  expiresAt?: number;
+  events: JobEvent[];
+  result?: any[];
+  error?: string;
+  instrumentation: ScriptInstrumentation[];
+}
+
+type JobListener = (event: JobEvent, job: ScheduleJob) => void;
+
+interface JobState {
+  jobs: Map<string, ScheduleJob>;
+  params: Map<string, any>;
+  queue: string[];
+  running: number;
+  listeners: Map<string, Set<JobListener>>;
+  sweeper?: NodeJS.Timeout;
+}
+
+// Heavy generations running at once; the Python stages share files in the working directory
+const MAX_CONCURRENT_JOBS = parseInt(process.env.SCHEDULE_MAX_CONCURRENT_JOBS || '1', 10);
+// Jobs waiting for a slot before new submissions are rejected
+const MAX_QUEUED_JOBS = parseInt(process.env.SCHEDULE_MAX_QUEUED_JOBS || '20', 10);
+// How long finished jobs stay available for retrieval
+const JOB_TTL_MS = parseInt(process.env.SCHEDULE_JOB_TTL_MS || String(30 * 60 * 1000), 10);
+
+export class JobQueueFullError extends Error {}
+
+// Kept on globalThis so the state survives module reloads in development
+const globalState = globalThis as typeof globalThis & { __scheduleJobs?: JobState };
+
+function state(): JobState {
+  if (!globalState.__scheduleJobs) {
+    const jobState: JobState = {
+      jobs: new Map(),
+      params: new Map(),
+      queue: [],
+      running: 0,
+      listeners: new Map()
+    };
+    jobState.sweeper = setInterval(expireJobs, 60 * 1000);
+    jobState.sweeper.unref?.();
+    globalState.__scheduleJobs = jobState;
+  }
+  return globalState.__scheduleJobs;
+}
+
+function expireJobs() {
+  const { jobs, listeners } = state();
+  const now = Date.now();
+  jobs.forEach((job, id) => {
+    if (job.expiresAt && job.expiresAt <= now) {
+      jobs.delete(id);
+      listeners.delete(id);
+    }
+  });
+}
+
+function emit(job: ScheduleJob, event: string, details: { [key: string]: any } = {}) {
+  const jobEvent: JobEvent = { ...details, id: job.events.length, event, timestamp: Date.now() };
+  job.events.push(jobEvent);
+  state().listeners.get(job.id)?.forEach(listener => listener(jobEvent, job));
+}
+
+function startNextJobs() {
+  const jobState = state();
+  while (jobState.running < MAX_CONCURRENT_JOBS && jobState.queue.length > 0) {
+    const jobId = jobState.queue.shift()!;
+    const job = jobState.jobs.get(jobId);
+    if (!job) continue;
+    jobState.running += 1;
+    runJob(job, jobState.params.get(jobId)).finally(() => {
+      jobState.params.delete(jobId);
+      jobState.running -= 1;
+      startNextJobs();
+    });
+  }
+}
+
+async function runJob(job: ScheduleJob, params: any) {
+  job.status = 'running';
+  job.startedAt = Date.now();
+  emit(job, 'started');
+
+  try {
+    const { schedule } = await runSchedulePipeline(params, {
+      instrumentation: job.instrumentation,
+      onProgress: ({ event, timestamp, ...details }) => emit(job, event, details)
+    });
+    job.result = schedule;
+    job.status = 'succeeded';
+    job.finishedAt = Date.now();
+    job.expiresAt = job.finishedAt + JOB_TTL_MS;
+    emit(job, 'succeeded', { tasks: schedule.length });
+  } catch (error) {
+    console.error(`Schedule job ${job.id} failed:`, error);
+    job.error = error instanceof Error ? error.message : 'Unknown error';
+    job.status = 'failed';
+    job.finishedAt = Date.now();
+    job.expiresAt = job.finishedAt + JOB_TTL_MS;
+    emit(job, 'failed', { error: job.error });
+  }
+}
+
+/**
+ * Queue a schedule generation and return immediately.
+ * Throws JobQueueFullError when MAX_QUEUED_JOBS jobs are already waiting.
+ */
+export function submitScheduleJob(params: any): ScheduleJob {
+  const jobState = state();
+  expireJobs();
+  if (jobState.queue.length >= MAX_QUEUED_JOBS) {
+    throw new JobQueueFullError(`Job queue is full (${MAX_QUEUED_JOBS} jobs waiting)`);
+  }
+
+  const job: ScheduleJob = {
+    id: randomUUID(),
+    status: 'queued',
+    createdAt: Date.now(),
+    events: [],
+    instrumentation: []
+  };
+  jobState.jobs.set(job.id, job);
+  jobState.params.set(job.id, params);
+  jobState.queue.push(job.id);
+  emit(job, 'queued', { position: jobState.queue.length });
+
+  startNextJobs();
+  return job;
+}
+
+export function getScheduleJob(jobId: string): ScheduleJob | undefined {
+  expireJobs();
+  return state().jobs.get(jobId);
+}
+
+export function isJobFinished(job: ScheduleJob): boolean {
+  return job.status === 'succeeded' || job.status === 'failed';
+}
+
+/** Follow the events of a job. Returns a function that removes the listener. */
+export function subscribeToJob(jobId: string, listener: JobListener): () => void {
+  const { listeners } = state();
+  if (!listeners.has(jobId)) listeners.set(jobId, new Set());
+  listeners.get(jobId)!.add(listener);
+  return () => {
+    listeners.get(jobId)?.delete(listener);
+  };
+}
+
+/** Resolve with the job once it has succeeded or failed. */
+export function waitForJob(job: ScheduleJob): Promise<ScheduleJob> {
+  if (isJobFinished(job)) return Promise.resolve(job);
+  return new Promise(resolve => {
+    const unsubscribe = subscribeToJob(job.id, (_event, current) => {
+      if (isJobFinished(current)) {
+        unsubscribe();
+        resolve(current);
+      }
+    });
+  });
+}
@@ -0,0 +1,300 @@
+import { spawn } from 'child_process';
+import path from 'path';
+import fs from 'fs';
+import {
+  ScriptInstrumentation,
+  createStderrReader,
+  extractInstrumentation,
+  instrumentedEnv,
+  ProgressEvent
+} from './pythonInstrumentation';
+import { decodeBinarySchedule, isBinarySchedule } from './scheduleFormat';
+
+export interface PipelineContext {
+  // Per-script timing and memory spans, collected when SCHEDULE_INSTRUMENTATION is set
+  instrumentation: ScriptInstrumentation[];
+  // Receives the progress events of the Python stages as they happen
+  onProgress?: (event: ProgressEvent) => void;
+}
+
+// Format the Python stages hand their schedules over in; 'json' restores the plain JSON output
+const WIRE_FORMAT = process.env.SCHEDULE_WIRE_FORMAT === 'json' ? 'json' : 'binary';
+
+export interface PipelineResult {
+  schedule: any[];
+  combinedSchedule: any[];
+}
+
+function pipelineEnv(context: PipelineContext): NodeJS.ProcessEnv {
+  const env = instrumentedEnv();
+  env.SCHEDULE_OUTPUT_FORMAT = WIRE_FORMAT;
+  if (context.onProgress) env.SCHEDULE_PROGRESS = '1';
+  return env;
+}
+
+function parseSchedule(data: Buffer): any[] {
+  return isBinarySchedule(data) ? decodeBinarySchedule(data) : JSON.parse(data.toString('utf8'));
+}
+
+export function transformScheduleData(scheduleData: any[]): any[] {
+  return scheduleData.map((task, index) => ({
+    id: task.task_id || `task-${index}`,
+    name: task.object_description || task.task_name || `Task ${index + 1}`,
+    start_date: task.start_date,
+    end_date: task.end_date,
+    duration: task.duration || 7, // Default 7 days if not specified
+    phase: task.phase || 'Construction',
+    dependencies: task.dependencies || [],
+    object_code: task.object_code,
+    object_count: task.object_count,
+    sequence: task.sequence,
+    level: task.level,
+    parent_id: task.parent_id
+  }));
+}
+
+/**
+ * Run the full generation: construction phases, BIM schedule, merge and Gantt charts.
+ * Gantt chart failures are logged but do not fail the pipeline.
+ */
+export async function runSchedulePipeline(params: any, context: PipelineContext): Promise<PipelineResult> {
+  // First, generate the construction schedule
+  const constructionOutput = await generateConstructionSchedule(params, context);
+
+  // Then, generate the BIM-based schedule
+  const bimSchedulePath = await generateBIMSchedule(context);
+
+  // Combine both schedules
+  const combinedSchedule = await mergeSchedules(constructionOutput, bimSchedulePath, params, context);
+
+  // Transform the data to match frontend expectations
+  const schedule = transformScheduleData(combinedSchedule);
+
+  // Try to generate Gantt chart (optional - don't fail if this doesn't work)
+  try {
+    await generateGanttChart(combinedSchedule, context);
+    console.log('Gantt chart generated successfully');
+  } catch (ganttError) {
+    console.warn('Gantt chart generation failed, but continuing:', ganttError);
+  }
+
+  return { schedule, combinedSchedule };
+}
+
+// Resolves with the script's raw output, which the merge stage reads as is
+async function generateConstructionSchedule(params: any, context: PipelineContext): Promise<Buffer> {
+  return new Promise((resolve, reject) => {
+    // Use the script in the current directory (schedule-planner)
+    const scriptPath = path.join(process.cwd(), 'create_construction_schedule.py');
+    
+    console.log('Attempting to run:', scriptPath);
+    console.log('Script exists:', fs.existsSync(scriptPath));
+    
+    const startedAt = Date.now();
+    const pythonProcess = spawn('python', [
+      scriptPath,
+      JSON.stringify(params)
+    ], { env: pipelineEnv(context) });
+
+    const output: Buffer[] = [];
+    const stderr = createStderrReader(context.onProgress);
+
+    pythonProcess.stdout.on('data', (data: Buffer) => {
+      output.push(data);
+    });
+
+    pythonProcess.stderr.on('data', (data) => {
+      stderr.push(data.toString());
+    });
+
+    pythonProcess.on('close', (code) => {
+      console.log('Construction schedule process closed with code:', code);
+      const extracted = extractInstrumentation(stderr.text(), Date.now() - startedAt);
+      const errorOutput = extracted.stderr;
+      if (extracted.instrumentation) context.instrumentation.push(extracted.instrumentation);
+      if (errorOutput) console.log('Construction schedule stderr:', errorOutput);
+      
+      if (code !== 0) {
+        reject(new Error(`Construction schedule generation failed: ${errorOutput}`));
+        return;
+      }
+
+      resolve(Buffer.concat(output));
+    });
+  });
+}
+
+// Resolves with the path of the schedule file the script wrote
+async function generateBIMSchedule(context: PipelineContext): Promise<string> {
+  return new Promise((resolve, reject) => {
+    // Use the script in the current directory (schedule-planner)
+    const scriptPath = path.join(process.cwd(), 'create_schedule_from_objects.py');
+    
+    console.log('Attempting to run BIM schedule:', scriptPath);
+    console.log('BIM script exists:', fs.existsSync(scriptPath));
+    
+    const startedAt = Date.now();
+    const pythonProcess = spawn('python', [scriptPath], { env: pipelineEnv(context) });
+
+    let output = '';
+    const stderr = createStderrReader(context.onProgress);
+
+    pythonProcess.stdout.on('data', (data) => {
+      output += data.toString();
+    });
+
+    pythonProcess.stderr.on('data', (data) => {
+      stderr.push(data.toString());
+    });
+
+    pythonProcess.on('close', (code) => {
+      console.log('BIM schedule process closed with code:', code);
+      const extracted = extractInstrumentation(stderr.text(), Date.now() - startedAt);
+      const errorOutput = extracted.stderr;
+      if (extracted.instrumentation) context.instrumentation.push(extracted.instrumentation);
+      if (errorOutput) console.log('BIM schedule stderr:', errorOutput);
+      
+      if (code !== 0) {
+        reject(new Error(`BIM schedule generation failed: ${errorOutput}`));
+        return;
+      }
+
+      // Use the schedule file in the current directory (schedule-planner)
+      const binaryPath = path.join(process.cwd(), 'detailed_schedule_with_child_tasks.schd');
+      const jsonPath = path.join(process.cwd(), 'detailed_schedule_with_child_tasks.json');
+      const schedulePath = WIRE_FORMAT === 'binary' && fs.existsSync(binaryPath) ? binaryPath : jsonPath;
+      console.log('BIM schedule file:', schedulePath);
+      console.log('Schedule file exists:', fs.existsSync(schedulePath));
+
+      if (!fs.existsSync(schedulePath)) {
+        reject(new Error('Failed to read BIM schedule'));
+        return;
+      }
+      resolve(schedulePath);
+    });
+  });
+}
+
+/**
+ * Merge the construction phases and the BIM schedule in merge_schedules.py, which
+ * shifts the BIM tasks behind their construction phases and orders everything by start date.
+ */
+async function mergeSchedules(constructionOutput: Buffer, bimSchedulePath: string, params: any,
+                              context: PipelineContext): Promise<any[]> {
+  return new Promise((resolve, reject) => {
+    const scriptPath = path.join(process.cwd(), 'merge_schedules.py');
+
+    const startedAt = Date.now();
+    const pythonProcess = spawn('python', [
+      scriptPath,
+      JSON.stringify(params),
+      '--bim',
+      bimSchedulePath
+    ], { env: pipelineEnv(context) });
+
+    const output: Buffer[] = [];
+    const stderr = createStderrReader(context.onProgress);
+
+    pythonProcess.stdout.on('data', (data: Buffer) => {
+      output.push(data);
+    });
+
+    pythonProcess.stderr.on('data', (data) => {
+      stderr.push(data.toString());
+    });
+
+    pythonProcess.on('close', (code) => {
+      const extracted = extractInstrumentation(stderr.text(), Date.now() - startedAt);
+      const errorOutput = extracted.stderr;
+      if (extracted.instrumentation) context.instrumentation.push(extracted.instrumentation);
+      if (errorOutput) console.log('Schedule merge stderr:', errorOutput);
+
+      if (code !== 0) {
+        reject(new Error(`Schedule merge failed: ${errorOutput || Buffer.concat(output).toString('utf8')}`));
+        return;
+      }
+
+      try {
+        resolve(parseSchedule(Buffer.concat(output)));
+      } catch (error) {
+        reject(new Error('Failed to parse merged schedule output'));
+      }
+    });
+
+    // The construction schedule is passed on in the format the construction script wrote it
+    pythonProcess.stdin.on('error', reject);
+    pythonProcess.stdin.end(constructionOutput);
+  });
+}
+
+async function generateGanttChart(schedule: any, context: PipelineContext): Promise<void> {
+  return new Promise((resolve, reject) => {
+    // Use the script in the current directory (schedule-planner)
+    const scriptPath = path.join(process.cwd(), 'create_improved_gantt.py');
+    
+    console.log('Attempting to run Gantt chart:', scriptPath);
+    console.log('Gantt script exists:', fs.existsSync(scriptPath));
+    
+    const startedAt = Date.now();
+    const pythonProcess = spawn('python', [scriptPath], { env: pipelineEnv(context) });
+
+    const stderr = createStderrReader(context.onProgress);
+
+    pythonProcess.stderr.on('data', (data) => {
+      stderr.push(data.toString());
+    });
+
+    pythonProcess.on('close', (code) => {
+      console.log('Gantt chart process closed with code:', code);
+      const extracted = extractInstrumentation(stderr.text(), Date.now() - startedAt);
+      const errorOutput = extracted.stderr;
+      if (extracted.instrumentation) context.instrumentation.push(extracted.instrumentation);
+      if (errorOutput) console.log('Gantt chart stderr:', errorOutput);
+      
+      if (code !== 0) {
+        reject(new Error(`Failed to generate Gantt chart: ${errorOutput}`));
+        return;
+      }
+      resolve();
+    });
+
+    // The schedule goes through stdin; large schedules exceed the argument size limit
+    pythonProcess.stdin.on('error', reject);
+    pythonProcess.stdin.end(JSON.stringify(schedule));
+  });
+} 
+/**
+ * Precompute the aggregated Gantt views of a list of tasks (frontend or pipeline
+ * format) into outputPath. Writes no other files, so it can run alongside jobs.
+ */
+export async function buildGanttRollups(tasks: any[], outputPath: string, context: PipelineContext): Promise<void> {
+  return new Promise((resolve, reject) => {
+    const scriptPath = path.join(process.cwd(), 'gantt_rollup.py');
+
+    const startedAt = Date.now();
+    const pythonProcess = spawn('python', [scriptPath, '--output', outputPath], { env: pipelineEnv(context) });
+
+    const stderr = createStderrReader(context.onProgress);
+
+    pythonProcess.stderr.on('data', (data) => {
+      stderr.push(data.toString());
+    });
+
+    pythonProcess.on('close', (code) => {
+      const extracted = extractInstrumentation(stderr.text(), Date.now() - startedAt);
+      const errorOutput = extracted.stderr;
+      if (extracted.instrumentation) context.instrumentation.push(extracted.instrumentation);
+      if (errorOutput) console.log('Gantt rollup stderr:', errorOutput);
+
+      if (code !== 0) {
+        reject(new Error(`Failed to generate Gantt rollups: ${errorOutput}`));
+        return;
+      }
+      resolve();
+    });
+
+    // The tasks go through stdin; large schedules exceed the argument size limit
+    pythonProcess.stdin.on('error', reject);
+    pythonProcess.stdin.end(JSON.stringify(tasks));
+  });
+}
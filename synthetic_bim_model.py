@@ -0,0 +1,254 @@
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from typing import List, Dict, Any
+
+# Characters allowed in a compressed IFC GlobalId (22 characters, base64 variant)
+IFC_GUID_CHARS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$"
+
+# Realistic storey names as they appear in the classification exports
+BASEMENT_FLOORS = ['UG02', 'UG01']
+
+
+def load_code_catalog(catalog_file: str = 'label_object_sequenced.json') -> Dict[str, Dict[str, Any]]:
+    """Load the real object code catalog used as the basis for synthetic models"""
+    with open(catalog_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def generate_global_id(rng: random.Random) -> str:
+    """Generate a random IFC-style GlobalId"""
+    return rng.choice('0123') + ''.join(rng.choice(IFC_GUID_CHARS) for _ in range(21))
+
+
+def generate_floor_names(floors: int) -> List[str]:
+    """Generate storey names: up to two basement levels followed by OG01, OG02, ..."""
+    basements = BASEMENT_FLOORS[-min(2, max(0, floors - 1)):] if floors > 1 else []
+    above_ground = [f"OG{i:02d}" for i in range(1, floors - len(basements) + 1)]
+    return basements + above_ground
+
+
+def scale_code_catalog(catalog: Dict[str, Dict[str, Any]], codes: int,
+                       dependency_density: float = 0.0, seed: int = 42) -> Dict[str, Dict[str, Any]]:
+    """
+    Derive a catalog with the requested number of codes from the real catalog.
+
+    Codes are taken from the real catalog first. If more codes are requested than
+    exist, synthetic child codes are added below the real codes, inheriting the
+    description and sequence of their parent. Each code then depends on earlier
+    codes with probability dependency_density.
+
+    Args:
+        catalog: Real code catalog (code -> description/sequence)
+        codes: Number of codes in the scaled catalog
+        dependency_density: Probability that a code depends on each of up to
+            three earlier codes (0.0 - 1.0)
+        seed: Random seed for reproducible catalogs
+
+    Returns:
+        Scaled catalog in the label_object_sequenced.json format
+    """
+    rng = random.Random(seed)
+    real_codes = list(catalog.keys())
+    selected = real_codes[:codes]
+
+    scaled = {code: {'description': catalog[code]['description'],
+                     'sequence': catalog[code]['sequence']} for code in selected}
+
+    synthetic_index = 0
+    while len(scaled) < codes:
+        parent = real_codes[synthetic_index % len(real_codes)]
+        code = f"{parent}.X{synthetic_index // len(real_codes) + 1:03d}"
+        scaled[code] = {
+            'description': f"{catalog[parent]['description']} (synthetic)",
+            'sequence': catalog[parent]['sequence']
+        }
+        synthetic_index += 1
+
+    if dependency_density > 0:
+        ordered = sorted(scaled, key=lambda c: scaled[c]['sequence'])
+        for i, code in enumerate(ordered):
+            candidates = ordered[max(0, i - 10):i]
+            depends_on = [c for c in rng.sample(candidates, min(3, len(candidates)))
+                          if rng.random() < dependency_density]
+            scaled[code]['depends_on'] = sorted(depends_on)
+
+    return scaled
+
+
+def generate_classification_results(catalog: Dict[str, Dict[str, Any]], objects: int,
+                                    floors: int = 8, seed: int = 42) -> List[Dict[str, Any]]:
+    """
+    Generate synthetic classification results for the given catalog.
+
+    Object counts per code follow a skewed distribution, similar to real models
+    where a few codes (walls, slabs, columns) dominate.
+    """
+    rng = random.Random(seed)
+    codes = list(catalog.keys())
+    weights = [1.0 / (rank + 1) for rank in range(len(codes))]
+    rng.shuffle(weights)
+    floor_names = generate_floor_names(floors)
+
+    labels = rng.choices(codes, weights=weights, k=objects)
+    results = []
+    for label in labels:
+        results.append({
+            'GlobalId': generate_global_id(rng),
+            'label': label,
+            'label_name': catalog[label]['description'],
+            'floor': rng.choice(floor_names),
+            'volume': round(rng.lognormvariate(0, 1), 3),
+            'area': round(rng.lognormvariate(1, 1), 3)
+        })
+    return results
+
+
+def generate_chunk_objects(classification_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Generate BIM objects in the bim_objects_with_volumes.json format used by split_json_file"""
+    chunk_objects = []
+    for i, result in enumerate(classification_results):
+        text = (
+            f"workspaceId: 1; objectId: {1000000 + i}.0; parentObjectId: 1000000.0; "
+            f"IfcProject: 625; IfcSite: 135; IfcBuilding: SYN-001; "
+            f"IfcBuildingStorey: {result['floor']}; ifc/GlobalId: {result['GlobalId']}; "
+            f"ifc/ObjectType: {result['label_name']}; "
+            f"ifc/properties/IfcClassificationReference/ItemReference: {result['label']}; "
+            f"name: {result['label_name']}:{i}"
+        )
+        chunk_objects.append({
+            'text': text,
+            'GlobalId': result['GlobalId'],
+            'volume': result['volume'],
+            'area': result['area']
+        })
+    return chunk_objects
+
+
+def generate_schedule_tasks(catalog: Dict[str, Dict[str, Any]],
+                            classification_results: List[Dict[str, Any]],
+                            floors: int = 8, start_date: str = "2024-01-01",
+                            per_floor: bool = True) -> List[Dict[str, Any]]:
+    """
+    Generate a schedule in the detailed_schedule_with_child_tasks.json format.
+
+    With per_floor=True one task is created per code and floor, which is how
+    floor-level schedules reach thousands of tasks.
+    """
+    base_date = datetime.strptime(start_date, "%Y-%m-%d")
+    counts = {}
+    for result in classification_results:
+        key = (result['label'], result['floor'] if per_floor else 'N/A')
+        counts[key] = counts.get(key, 0) + 1
+
+    floor_order = {floor: i for i, floor in enumerate(generate_floor_names(floors))}
+    tasks = []
+    for (code, floor), object_count in sorted(
+            counts.items(), key=lambda item: (catalog[item[0][0]]['sequence'],
+                                              floor_order.get(item[0][1], 0), item[0][0])):
+        sequence = catalog[code]['sequence']
+        offset = (sequence - 1) * 7 + floor_order.get(floor, 0) * 2
+        task_start = base_date + timedelta(days=offset)
+        task_end = task_start + timedelta(days=6)
+        task_id = f"{code}@{floor}" if per_floor else code
+        tasks.append({
+            'task_id': task_id,
+            'object_description': catalog[code]['description'],
+            'object_code': code,
+            'floor': floor,
+            'sequence': sequence,
+            'start_date': task_start.strftime('%a %d.%m.%y'),
+            'end_date': task_end.strftime('%a %d.%m.%y'),
+            'object_count': object_count,
+            'dependencies': catalog[code].get('depends_on', []),
+            'is_child': True
+        })
+    return tasks
+
+
+def generate_construction_params(start_date: str = "2024-01-01",
+                                 excavation_volume: float = 20000) -> Dict[str, Any]:
+    """Generate construction phase parameters with every supported phase enabled"""
+    return {
+        'projectStartDate': start_date,
+        'buildingType': 'Highrise Residential',
+        'siteEstablishment': {
+            'enabled': True,
+            'mobiliseDuration': 5,
+            'perimeterType': 'Hoarding',
+            'siteSheds': {'enabled': True, 'duration': 3, 'overlap': 1}
+        },
+        'demolition': {
+            'enabled': True,
+            'duration': 10,
+            'scaffolding': {'enabled': True, 'erectionDuration': 3, 'dismantleDuration': 2}
+        },
+        'excavation': {
+            'enabled': True,
+            'soilType': 'Medium Soils',
+            'volume': excavation_volume,
+            'dailyRate': 100
+        },
+        'substructure': {'enabled': True, 'type': 'Raft Foundation', 'overlapWithPrevious': 0},
+        'structure': {
+            'enabled': True,
+            'concreteCoreIncluded': True,
+            'coreConstructionType': 'Jump Form',
+            'basementIncluded': True
+        },
+        'superstructure': {'enabled': True, 'floorsAboveGround': 8, 'floorType': 'In-situ Concrete Frame'},
+        'facade': {'enabled': True, 'type': 'Curtain Wall', 'durationPerLevel': 5},
+        'fitout': {'enabled': True, 'baseDuration': 20}
+    }
+
+
+def write_synthetic_model(output_dir: str, objects: int = 10000, codes: int = 100,
+                          floors: int = 8, dependency_density: float = 0.0,
+                          catalog_file: str = 'label_object_sequenced.json',
+                          seed: int = 42) -> Dict[str, str]:
+    """
+    Write a complete synthetic model to output_dir.
+
+    Returns:
+        Mapping of dataset name to the written file path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    catalog = scale_code_catalog(load_code_catalog(catalog_file), codes,
+                                 dependency_density=dependency_density, seed=seed)
+    results = generate_classification_results(catalog, objects, floors=floors, seed=seed)
+
+    datasets = {
+        'label_object_sequenced.json': catalog,
+        'classification_results_bim_gemini_20250612_095607.json': results,
+        'bim_objects_with_volumes.json': generate_chunk_objects(results),
+        'detailed_schedule_with_child_tasks.json': generate_schedule_tasks(catalog, results, floors=floors),
+        'construction_params.json': generate_construction_params()
+    }
+
+    paths = {}
+    for filename, data in datasets.items():
+        path = os.path.join(output_dir, filename)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        paths[filename] = path
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic BIM model for benchmarking")
+    parser.add_argument('output_dir', help="Directory to write the synthetic model to")
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--codes', type=int, default=100)
+    parser.add_argument('--floors', type=int, default=8)
+    parser.add_argument('--dependency-density', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    written = write_synthetic_model(args.output_dir, objects=args.objects, codes=args.codes,
+                                    floors=args.floors, dependency_density=args.dependency_density,
+                                    seed=args.seed)
+    for name, path in written.items():
+        print(f"   • {path}")